@@ -21,18 +21,32 @@
 # ***********************************************************************
 
 import FreeCAD, FreeCADGui
-from menu.ModernMenu import QModernMenu
+from menu.ModernMenu import QModernMenu, QModernTab, QModernPaintedSection
 from menu.FileMenu import QFileMenu, QFileMenuPanel
-from menu.RecentFilesManager import QRecentFilesManager
 from PySide2 import QtCore, QtGui, QtWidgets
 from Preferences import Preferences
+from Snapshot import RibbonSnapshot
+from ToolbarRegistry import ToolbarRegistry
+from Icons import icons
+from Settings import settings
+from Scheduler import IdleScheduler
+from Usage import UsageTracker
+from Session import session
 from dock import ModernDock
 import webbrowser
-import os
+import importlib
+import sys
+from collections import OrderedDict
 
 mw = FreeCADGui.getMainWindow()
 p = FreeCAD.ParamGet("User parameter:BaseApp/ModernUI")
-path = os.path.dirname(__file__) + "/Resources/icons/"
+
+# Frequently run commands shown in quick access besides the pinned ones
+QUICK_COUNT = 5
+
+# Toolbars left out of the ribbon and toolbars shown with icons only
+Defaults = ['Workbench', 'View', 'Macro']
+show = ['File', 'Structure']
 
 class MenuDock(QtWidgets.QDockWidget):
     """
@@ -54,18 +68,63 @@ class ModernMenu(QModernMenu):
     """
     Create ModernMenu QWidget.
     """
-    actions = {}
-    Enabled = {}
 
     def __init__(self):
         """
         Constructor
         """
-        icon = QtGui.QIcon(path + 'ModernUI')
+        icon = icons.resourceIcon('ModernUI')
         super(ModernMenu, self).__init__(icon, 'Modern UI')
-        self._tabBar.currentChanged.connect(self.selectWorkbench)
+        self.actions = {}
+        self.Enabled = {}
+        self.snapshot = RibbonSnapshot()
+        self.tabLayouts = {}
+        self.tabButtons = {}
+        self.verified = {}
+        self.tabIndex = {}
+        self.usage = UsageTracker()
+        self.scheduler = IdleScheduler(parent=self)
+        self.toolbars = ToolbarRegistry(mw)
+        self.fileMenus = {}
+        self.tabSections = {}
+        self.appliedStyle = self.buttonStyle()
+        self.quickCommands = None
+        self.groupMenus = {}
+        self.generations = {}
+        self.recentTabs = OrderedDict()
+        self.building = True
+        self.toolbarTimer = QtCore.QTimer(self)
+        self.toolbarTimer.setSingleShot(True)
+        self.toolbarTimer.setInterval(250)
+        self.toolbarTimer.timeout.connect(self.reconcileActiveTab)
+        self.toolbars.changed.connect(self.toolbarTimer.start)
+        settings.changed.connect(self.onSettingChanged)
+        self._stack.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self._stack.customContextMenuRequested.connect(self.ribbonContextMenu)
+        self._quickBar.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self._quickBar.customContextMenuRequested.connect(self.quickContextMenu)
+        self._minBtn.clicked.connect(lambda: session.setValue("minimized", self._tabHidden))
         self.createModernMenu()
-        self.selectWorkbench()
+        # Adding the first tab selects it, connect after so the saved tab survives
+        self._tabBar.currentChanged.connect(self.selectWorkbench)
+        self.restoreSession()
+        self.building = False
+        self.refreshQuickAccess()
+        self.prebuildTabs()
+
+    def restoreSession(self):
+        """
+        Select the last used tab and minimize the ribbon if it was minimized.
+        """
+        index = self.tabIndex.get(session.value("tab"))
+        if index is not None and index != self._tabBar.currentIndex():
+            self._tabBar.setCurrentIndex(index)
+        else:
+            self.selectWorkbench()
+        if settings.browseTabs:
+            self.activateTab(self._tabBar.currentIndex())
+        if session.value("minimized", False) and not self._tabHidden:
+            self._handleMinBtnClick()
 
     def createModernMenu(self):
         """
@@ -76,14 +135,24 @@ class ModernMenu(QModernMenu):
         for position in positionList:
             try:
                 if position in enabledList:
-                    Icon = self.getWorkbenchIcon(WBList[position].Icon)
                     Name = WBList[position].MenuText
                     self.actions[Name] = position
                     self.Enabled[Name] = False
-                    self.addTab(Icon, Name)
+                    self.addTab(icons.placeholder(), Name, self.createTab)
+                    self.tabIndex[Name] = len(self._tabs) - 1
+                    icons.requestIcon(WBList[position].Icon,
+                        lambda Icon, index=self.tabIndex[Name]: self._tabBar.setTabIcon(index, Icon))
             except Exception:
                 pass
 
+    def createTab(self, title):
+        """
+        Create the contents of a tab.
+        """
+        if settings.paintedButtons:
+            return QModernTab(title, QModernPaintedSection)
+        return QModernTab(title)
+
     def createFileMenu(self):
         """
         Add file, macro toolbars and settings to file menu and add recent files.
@@ -91,46 +160,80 @@ class ModernMenu(QModernMenu):
         workbench = FreeCADGui.activeWorkbench()
         if not hasattr(workbench,'__Workbench__'): return
         menu_list = workbench.listMenus()
-        fileMenu = QFileMenu()
         menuBar = mw.menuBar()
+
+        # Reuse the file menu built for this workbench unless its menus changed
+        name = workbench.name()
+        signature = self.fileMenuSignature(menu_list, menuBar)
+        cached = self.fileMenus.get(name)
+        if cached and cached[0] == signature:
+            fileMenu = cached[1]
+        else:
+            if cached: cached[1].deleteLater()
+            fileMenu = self.buildFileMenu(menu_list, menuBar)
+            cached = [signature, fileMenu, None]
+            self.fileMenus[name] = cached
+
+        # Refresh recent files only when the list changed
+        fileList = self.getRecentFiles()
+        if cached[2] != fileList:
+            fileMenu.RecentFilesManager().setPaths(fileList)
+            cached[2] = fileList
+
+        if fileMenu is not self.fileMenu():
+            self.setFileMenu(fileMenu)
+
+    def fileMenuSignature(self, menu_list, menuBar):
+        """
+        Return signature of workbench menus and menubar actions.
+        """
+        actions = tuple((a.text(), a.data(), a.isSeparator()) for a in menuBar.actions())
+        return (tuple(menu_list), actions)
+
+    def buildFileMenu(self, menu_list, menuBar):
+        """
+        Create file menu from menubar menus of the workbench.
+        """
+        fileMenu = QFileMenu()
         for action in menuBar.actions():
             if action.data() not in menu_list:continue
             if action.isSeparator():
                 fileMenu.addSeparator()
 
             else:
-                panel = QFileMenuPanel(action.text().replace('&', ''))
-                fileMenu.addArrowButton(panel, icon=action.icon(), title=action.text())
-
-                for action in action.menu().actions():
-                    if action.isSeparator():
-                        panel.addSeparator()
-
-                    else:
-                        btn = panel.addButton()
-                        btn.setDefaultAction(action)
+                fileMenu.addArrowButton(
+                    lambda menuAction=action: self.buildMenuPanel(menuAction),
+                    icon=action.icon(), title=action.text())
 
         # Add settings to file menu
         fileMenu.addSeparator()
         fileMenu.addButton(
-            icon= path+'Patreon', title='Support Developer',handler=self.open_donation, 
+            icon= icons.resourceIcon('Patreon'), title='Support Developer',handler=self.open_donation, 
             statusTip='Support Hakan Seven to see more update on ModernUI')
 
         # Add settings to file menu
         fileMenu.addSeparator()
         fileMenu.addButton(
-            icon= path+'Settings', title='Modern Settings',handler=Preferences, 
+            icon= icons.resourceIcon('Settings'), title='Modern Settings',handler=Preferences, 
             statusTip='Set Modern Menu Preferences')
 
         # Add recent files
         fileMenu.recentFileClicked.connect(self.openFile)
-        fileList = self.getRecentFiles()
-        fileList.reverse()
-        RFManager = QRecentFilesManager()
-        for file in fileList:
-            RFManager.addPath(file)
-        fileMenu.setRecentFilesManager(RFManager)
-        self.setFileMenu(fileMenu)
+        return fileMenu
+
+    def buildMenuPanel(self, menuAction):
+        """
+        Create file menu panel from a menubar menu.
+        """
+        panel = QFileMenuPanel(menuAction.text().replace('&', ''))
+        for action in menuAction.menu().actions():
+            if action.isSeparator():
+                panel.addSeparator()
+
+            else:
+                btn = panel.addButton()
+                btn.setDefaultAction(action)
+        return panel
 
     def open_donation(self):
         webbrowser.open('https://www.patreon.com/HakanSeven12')
@@ -140,64 +243,506 @@ class ModernMenu(QModernMenu):
         Import selected workbench toolbars to ModernMenu section.
         """
         # Get selected tab
-        Defaults = ['Workbench', 'View', 'Macro']
-        show = ['File', 'Structure']
-
         index = self._tabBar.currentIndex()
         tabName = self._tabBar.tabText(index)
-        tab = self._tabs[index]
 
-        # Activate selected workbench
         tabName = tabName.replace('&', '')
         if tabName == 'Modern UI': return
+        if tabName not in self.actions: return
+        tab = self.tab(index)
+        # Only switches the user makes count for the prebuild ranking
+        if not self.building: self.usage.record(self.actions[tabName])
+        self.scheduler.finish(tabName)
+        self.recentTabs.pop(tabName, None)
+        self.recentTabs[tabName] = True
+        if not self.building: session.setValue("tab", tabName)
+        self.refreshQuickAccess()
+
+        # Draw the tab from its snapshot and activate the workbench after it is shown
+        if not self.Enabled[tabName]:
+            layout = self.snapshot.layout(self.actions[tabName])
+            if layout:
+                self.buildTab(tab, tabName, layout)
+                self.Enabled[tabName] = True
+                self.verified[tabName] = False
+                self.trimTabs()
+                if not settings.browseTabs:
+                    QtCore.QTimer.singleShot(0, lambda: self.activateTab(index))
+                return
+
+        # Browsing only shows the tab, its workbench is activated on first use
+        if settings.browseTabs and self.Enabled[tabName]: return
+        self.activateTab(index)
+
+    def ensureActive(self, tabName):
+        """
+        Activate workbench of a browsed tab before one of its commands runs.
+        """
+        workbench = FreeCADGui.activeWorkbench()
+        if hasattr(workbench, '__Workbench__') and workbench.name() == self.actions[tabName]: return
+        self.activateTab(self.tabIndex[tabName])
+
+    def activateTab(self, index):
+        """
+        Activate workbench of the tab and check the tab against live toolbars.
+        """
+        if index != self._tabBar.currentIndex(): return
+        tabName = self._tabBar.tabText(index).replace('&', '')
+        if tabName not in self.actions: return
+        tab = self.tab(index)
+
+        # Activate selected workbench, noting the modules its first activation imports
+        loaded = set(sys.modules)
+        first = not hasattr(FreeCADGui.getWorkbench(self.actions[tabName]), '__Workbench__')
         FreeCADGui.activateWorkbench(self.actions[tabName])
         workbench = FreeCADGui.activeWorkbench()
+        if first:
+            self.snapshot.setModules(self.actions[tabName],
+                [name for name in list(sys.modules) if name not in loaded])
 
         # Hide selected workbench toolbars
         #mw.menuBar().hide()
         self.createFileMenu()
-        for tbb in mw.findChildren(QtWidgets.QToolBar):
-            if tbb.objectName() in ["draft_status_scale_widget", "draft_snap_widget"]: continue
-            tbb.hide()
+        self.hideToolbars()
+
+        # Skip checking when no toolbar changed since the tab was checked
+        if self.Enabled[tabName] and self.verified.get(tabName, True) \
+            and self.generations.get(tabName) == self.toolbars.generation: return
+        if not hasattr(workbench,'__Workbench__'): return
 
         # Import active workbench toolbars to menu sections
-        NORParam = p.GetString("NumberOfRows", "3")
-        if NORParam == "3":
-            NOR = 3
-        elif NORParam == "4":
-            NOR = 4
+        layout, bindings = self.toolbarLayout(tabName, workbench)
+        self.snapshot.setLayout(self.actions[tabName], layout)
+        if self.Enabled[tabName]:
+            if self.tabLayouts[tabName] != layout:
+                self.reconcileTab(tab, tabName, layout, bindings)
+            self.bindButtons(tabName, bindings)
         else:
-            NOR = 5
+            self.buildTab(tab, tabName, layout, bindings)
+        self.Enabled[tabName] = True
+        self.verified[tabName] = True
+        self.generations[tabName] = self.toolbars.generation
+        self.trimTabs()
+        self.prebuildTabs()
 
-        if self.Enabled[tabName]: return
-        if not hasattr(workbench,'__Workbench__'): return
+    def reconcileActiveTab(self):
+        """
+        Follow toolbars changed while the workbench of the current tab is active.
+        """
+        index = self._tabBar.currentIndex()
+        tabName = self._tabBar.tabText(index).replace('&', '')
+        if tabName not in self.actions or not self.Enabled[tabName]: return
+        workbench = FreeCADGui.activeWorkbench()
+        if not hasattr(workbench,'__Workbench__') or workbench.name() != self.actions[tabName]: return
+        self.activateTab(index)
+
+    def hideToolbars(self):
+        """
+        Hide toolbars of the active workbench.
+        """
+        for tbb in self.toolbars.toolbars():
+            if tbb.objectName() in ["draft_status_scale_widget", "draft_snap_widget"]: continue
+            tbb.hide()
+
+    def prebuildTabs(self, count=3):
+        """
+        Build the tabs the user is most likely to open next while idle.
+        """
+        names = {wb: name for name, wb in self.actions.items()}
+        room = settings.tabCache - sum(self.Enabled.values())
+        for wb in self.usage.ranked(list(names))[:count]:
+            tabName = names[wb]
+            if self.Enabled[tabName]: continue
+            if room <= 0: break
+            room -= 1
+            layout = self.snapshot.layout(wb)
+            if not layout: continue
+            tab = self.tab(self.tabIndex[tabName])
+            self.scheduler.add(tabName, self.prebuildSteps(tab, tabName, layout))
+
+    def prebuildSteps(self, tab, tabName, layout):
+        """
+        Build a tab from its snapshot in idle steps.
+        """
+        yield from self.buildTabSteps(tab, tabName, layout)
+        self.Enabled[tabName] = True
+        self.verified[tabName] = False
+
+        # Prebuilt tabs that were never opened are released first
+        if tabName not in self.recentTabs:
+            self.recentTabs[tabName] = True
+            self.recentTabs.move_to_end(tabName, last=False)
+
+    def trimTabs(self):
+        """
+        Release the least recently used built tabs beyond the preferred count.
+        """
+        current = self._tabBar.tabText(self._tabBar.currentIndex()).replace('&', '')
+        excess = sum(self.Enabled.values()) - settings.tabCache
+        for tabName in list(self.recentTabs):
+            if excess <= 0: break
+            if tabName == current or not self.Enabled[tabName]: continue
+            self.releaseBuiltTab(tabName)
+            excess -= 1
+
+    def releaseBuiltTab(self, tabName):
+        """
+        Destroy the widgets of a built tab, it is drawn again from its snapshot.
+        """
+        self.scheduler.cancel(tabName)
+        self.releaseTab(self.tabIndex[tabName], self.createTab)
+        self.Enabled[tabName] = False
+        for cache in (self.verified, self.tabLayouts, self.tabSections,
+                      self.tabButtons, self.generations, self.recentTabs):
+            cache.pop(tabName, None)
+
+    def toolbarLayout(self, tabName, workbench):
+        """
+        Return layout of workbench toolbars and live actions of its commands.
+        Toolbar contents come from the command registry, toolbars it does not
+        describe are read from their widgets.
+        """
+        try:
+            items = workbench.getToolbarItems()
+        except Exception:
+            items = {}
+
+        layout = []
+        bindings = {}
         for toolbar in workbench.listToolbars():
             if toolbar in Defaults: continue
-            section = tab.addSection(toolbar.replace(tabName+" ", "").capitalize(), NOR)
+            buttons = None
+            if toolbar in items:
+                buttons = self.commandButtons(toolbar, items[toolbar], bindings)
+            if buttons is None:
+                buttons = self.scrapedButtons(toolbar, bindings)
+            if buttons is None: continue
+            layout.append({
+                "toolbar": toolbar,
+                "title": toolbar.replace(tabName+" ", "").capitalize(),
+                "buttons": buttons})
+        return layout, bindings
+
+    def commandButtons(self, toolbar, commands, bindings):
+        """
+        Return button entries of a toolbar from its command names,
+        None if the commands cannot be looked up.
+        """
+        buttons = []
+        try:
+            for command in commands:
+                if command == "Separator": continue
+                cmd = FreeCADGui.Command.get(command)
+                if cmd is None: continue
+                actions = cmd.getAction()
+                if not actions: continue
+                info = cmd.getInfo()
+                menu = self.groupMenu(command, actions) if len(actions) > 1 else None
+                bindings[command] = (actions[0], menu)
+                buttons.append({
+                    "command": command,
+                    "text": info["menuText"],
+                    "icon": info["pixmap"],
+                    "menu": menu is not None,
+                    "iconOnly": toolbar in show})
+        except Exception:
+            return None
+        return buttons or None
 
-            # Import toolbars buttons to menu buttons
-            TB = mw.findChildren(QtWidgets.QToolBar, toolbar)
-            for button in TB[0].findChildren(QtWidgets.QToolButton):
-                if button.text() == '': continue
-                action = button.defaultAction()
+    def scrapedButtons(self, toolbar, bindings):
+        """
+        Return button entries of a toolbar from its tool buttons,
+        None if the toolbar does not exist.
+        """
+        TB = self.toolbars.toolbar(toolbar)
+        if TB is None: return None
+        buttons = []
+        for button in self.toolbars.buttons(TB):
+            if button.text() == '': continue
+            action = button.defaultAction()
+            command = action.objectName() or action.text()
+            bindings[command] = (action, button.menu())
+            buttons.append({
+                "command": command,
+                "text": action.text(),
+                "icon": self.commandPixmap(command),
+                "menu": button.menu() is not None,
+                "iconOnly": toolbar in show})
+        return buttons
+
+    def groupMenu(self, command, actions):
+        """
+        Return a drop down menu holding the actions of a group command.
+        """
+        menu = self.groupMenus.get(command)
+        if menu is None or menu.actions() != actions:
+            if menu is not None: menu.deleteLater()
+            menu = QtWidgets.QMenu(self)
+            menu.addActions(actions)
+            self.groupMenus[command] = menu
+        return menu
+
+    def buildTab(self, tab, tabName, layout, bindings=None):
+        """
+        Create tab sections from a layout.
+        """
+        for _ in self.buildTabSteps(tab, tabName, layout, bindings): pass
 
-                sizeParam = p.GetString("IconSize", "Small")
-                if sizeParam == "Small":
-                    size=False
+    def buildTabSteps(self, tab, tabName, layout, bindings=None):
+        """
+        Create tab sections from a layout, yielding after each section.
+        """
+        NOR, size, styleParam = self.buttonStyle()
+
+        if bindings is None: bindings = {}
+        sections = []
+        buttons = []
+        for entry in layout:
+            section = tab.addSection(entry["title"], NOR)
+            sections.append(section)
+            for item in entry["buttons"]:
+                btn = self.createButton(section, tabName, item, bindings, size, styleParam)
+                buttons.append((item, btn))
+            yield
+
+        self.tabLayouts[tabName] = layout
+        self.tabSections[tabName] = sections
+        self.tabButtons[tabName] = buttons
+
+    def createButton(self, section, tabName, item, bindings, size, styleParam):
+        """
+        Add a ribbon button for a layout entry to the end of a section.
+        """
+        action, menu = bindings.get(item["command"], (None, None))
+        if action is None:
+            action = self.commandAction(section, item)
+        btn = section.addButton(full=size, menu=menu)
+        btn.setDefaultAction(action)
+        btn.setProperty("command", item["command"])
+        btn.pressed.connect(lambda name=tabName: self.ensureActive(name))
+        btn.clicked.connect(lambda checked=False, command=item["command"]: self.usage.recordCommand(command))
+        self.styleButton(btn, item, size, styleParam)
+        return btn
+
+    def reconcileTab(self, tab, tabName, layout, bindings):
+        """
+        Change a built tab to a new layout, adding, removing and moving only
+        the sections and buttons that differ.
+        """
+        NOR, size, styleParam = self.buttonStyle()
+
+        # Group built buttons by section
+        built = {}
+        buttons = iter(self.tabButtons[tabName])
+        for entry, section in zip(self.tabLayouts[tabName], self.tabSections[tabName]):
+            built[entry["toolbar"]] = (section, [next(buttons) for _ in entry["buttons"]])
+
+        tab.setUpdatesEnabled(False)
+        sections = []
+        buttons = []
+        for entry in layout:
+            if entry["toolbar"] in built:
+                section, old = built.pop(entry["toolbar"])
+                if section.title() != entry["title"]: section.setTitle(entry["title"])
+            else:
+                section, old = tab.addSection(entry["title"], NOR), []
+
+            # Keep buttons whose entry did not change, create the others
+            widgets = []
+            for item in entry["buttons"]:
+                match = next((pair for pair in old if pair[0] == item), None)
+                if match is None:
+                    btn = self.createButton(section, tabName, item, bindings, size, styleParam)
                 else:
-                    size=True
+                    old.remove(match)
+                    btn = match[1]
+                widgets.append(btn)
+                buttons.append((item, btn))
+            for item, btn in old:
+                section.takeWidget(btn)
+                btn.deleteLater()
+            if old or section.widgets() != widgets: section.setWidgetOrder(widgets)
+            sections.append(section)
+
+        for section, old in built.values():
+            tab.removeSection(section)
+        for index, section in enumerate(sections):
+            tab.moveSection(section, index)
+        tab.setUpdatesEnabled(True)
+
+        self.tabLayouts[tabName] = layout
+        self.tabSections[tabName] = sections
+        self.tabButtons[tabName] = buttons
+
+    def buttonStyle(self):
+        """
+        Return number of rows, button size and button style preferences.
+        """
+        return settings.numberOfRows, settings.fullButtons, settings.iconStyle
 
-                btn = section.addButton(full=size, menu=button.menu())
-                btn.setDefaultAction(action)
+    def styleButton(self, btn, item, size, styleParam):
+        """
+        Set tool button style of a ribbon button.
+        """
+        if styleParam == "Text":
+            btn.setToolButtonStyle(QtCore.Qt.ToolButtonTextOnly)
 
-                styleParam = p.GetString("IconStyle", "Icon and text")
-                if styleParam == "Text":
-                    btn.setToolButtonStyle(QtCore.Qt.ToolButtonTextOnly)
+        elif styleParam == "Icon" or item["iconOnly"]:
+            btn.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
 
-                elif styleParam == "Icon" or toolbar in show:
-                    btn.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
+        elif size:
+            btn.setToolButtonStyle(QtCore.Qt.ToolButtonTextUnderIcon)
 
-        self.Enabled[tabName] = True
+        else:
+            btn.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
+
+    def restyleTabs(self):
+        """
+        Apply style preferences to the buttons of built tabs in place.
+        """
+        style = self.buttonStyle()
+        if style == self.appliedStyle: return
+        self.appliedStyle = style
+        NOR, size, styleParam = style
+
+        for tabName, sections in self.tabSections.items():
+            tab = self.tab(self.tabIndex[tabName])
+            tab.setUpdatesEnabled(False)
+            for section in sections:
+                section.setButtonSize(size)
+                section.setRowCount(NOR)
+            for item, btn in self.tabButtons[tabName]:
+                self.styleButton(btn, item, size, styleParam)
+            tab.setUpdatesEnabled(True)
+
+    def onSettingChanged(self, key):
+        """
+        Follow preference changes.
+        """
+        if key in ("IconStyle", "IconSize", "NumberOfRows"):
+            self.restyleTabs()
+        elif key == "QuickAccess":
+            self.refreshQuickAccess()
+        elif key == "TabCache":
+            self.trimTabs()
+        elif key == "PaintedButtons":
+            # prebuild jobs would keep filling tabs of the old section class
+            self.scheduler.clear()
+            for tabName, index in self.tabIndex.items():
+                if self._tabs[index] != None: self.releaseBuiltTab(tabName)
+            self.selectWorkbench()
+
+    def refreshQuickAccess(self):
+        """
+        Show pinned and frequently run commands in quick access.
+        """
+        known = self.snapshot.commands()
+        pinned = [c for c in settings.quickAccess if c in known]
+        frequent = [c for c in self.usage.rankedCommands() if c in known and c not in pinned]
+        commands = pinned + frequent[:QUICK_COUNT]
+        if commands == self.quickCommands: return
+        self.quickCommands = commands
+
+        bar = self._quickBar
+        bar.clear()
+        for command in commands:
+            workbench, item = known[command]
+            action = bar.addAction(icons.placeholder(), item["text"])
+            action.setData(command)
+            icons.requestCommandIcon(item["icon"], action.setIcon)
+            action.triggered.connect(
+                lambda checked=False, command=command, workbench=workbench: self.runQuickCommand(command, workbench))
+
+    def runQuickCommand(self, command, workbench):
+        """
+        Run a quick access command without switching workbenches.
+        """
+        if command not in FreeCADGui.listCommands():
+            self.loadWorkbenchModules(workbench)
+        if command not in FreeCADGui.listCommands():
+            FreeCAD.Console.PrintWarning("Modern UI: {} is available once {} "
+                "has been activated\n".format(command, workbench))
+            return
+        self.usage.recordCommand(command)
+        FreeCADGui.runCommand(command)
+
+    def loadWorkbenchModules(self, workbench):
+        """
+        Import the modules the first activation of a workbench imported,
+        without activating it.
+        """
+        for name in self.snapshot.modules(workbench):
+            if name in sys.modules: continue
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    def setQuickPinned(self, command, pinned):
+        """
+        Add command to or remove it from pinned quick access commands.
+        """
+        commands = [c for c in settings.quickAccess if c != command]
+        if pinned: commands.append(command)
+        p.SetString("QuickAccess", ",".join(commands))
+
+    def ribbonContextMenu(self, pos):
+        """
+        Offer to pin the ribbon button under the cursor to quick access.
+        """
+        btn = self._stack.childAt(pos)
+        if isinstance(btn, QModernPaintedSection):
+            btn = btn.buttonAt(btn.mapFrom(self._stack, pos))
+        elif not isinstance(btn, QtWidgets.QToolButton):
+            btn = None
+        command = btn.property("command") if btn is not None else None
+        if not command or command in settings.quickAccess: return
+        menu = QtWidgets.QMenu(self)
+        menu.addAction("Add to Quick Access", lambda: self.setQuickPinned(command, True))
+        menu.exec_(self._stack.mapToGlobal(pos))
+
+    def quickContextMenu(self, pos):
+        """
+        Offer to unpin the quick access command under the cursor.
+        """
+        action = self._quickBar.actionAt(pos)
+        if action is None or action.data() not in settings.quickAccess: return
+        menu = QtWidgets.QMenu(self)
+        menu.addAction("Remove from Quick Access", lambda: self.setQuickPinned(action.data(), False))
+        menu.exec_(self._quickBar.mapToGlobal(pos))
+
+    def bindButtons(self, tabName, bindings):
+        """
+        Bind buttons drawn from snapshot to live actions.
+        """
+        for item, btn in self.tabButtons[tabName]:
+            command = item["command"]
+            if command not in bindings: continue
+            action, menu = bindings[command]
+            btn.setDefaultAction(action)
+            if menu is not None:
+                btn.setMenu(menu)
+                btn.setPopupMode(QtWidgets.QToolButton.MenuButtonPopup)
+
+    def commandAction(self, parent, item):
+        """
+        Return an action that runs the command of a snapshot button.
+        """
+        action = QtWidgets.QAction(parent)
+        action.setText(item["text"])
+        action.setIcon(icons.placeholder())
+        icons.requestCommandIcon(item["icon"], action.setIcon)
+        action.triggered.connect(lambda checked=False, name=item["command"]: FreeCADGui.runCommand(name))
+        return action
+
+    def commandPixmap(self, command):
+        """
+        Return pixmap reference of a command.
+        """
+        try:
+            return FreeCADGui.Command.get(command).getInfo()["pixmap"]
+        except Exception:
+            return ""
 
     def getParameters(self):
         """
@@ -224,27 +769,6 @@ class ModernMenu(QModernMenu):
 
         return enabled, position
 
-    def getWorkbenchIcon(self, icon):
-        """
-        Return workbench icon
-        """
-        if str(icon.find("XPM")) != "-1":
-            Icon = []
-            for a in ((((icon
-                        .split('{', 1)[1])
-                        .rsplit('}', 1)[0])
-                    .strip())
-                    .split("\n")):
-                Icon.append((a
-                            .split('"', 1)[1])
-                            .rsplit('"', 1)[0])
-            Icon = QtGui.QIcon(QtGui.QPixmap(Icon))
-        else:
-            Icon = QtGui.QIcon(QtGui.QPixmap(icon))
-        if Icon.isNull():
-            Icon = QtGui.QIcon(":/icons/freecad")
-        return Icon
-
     def getRecentFiles(self):
         """
         Return recent files list.
@@ -286,5 +810,4 @@ class run:
             if disable: return
             mw.addDockWidget(
                 QtCore.Qt.TopDockWidgetArea, MenuDock())
-            CollapsDock = p.GetString("CollapsibleDock", "On")
-            if CollapsDock == "On": ModernDock.run()
+            if settings.collapsibleDock: ModernDock.run()
@@ -0,0 +1,388 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Shared icon service. Decoded icons are kept in memory and rasterized
+pixmaps are stored on disk, so warm starts do not parse icons again.
+"""
+
+from PySide2 import QtCore, QtGui, QtWidgets
+from collections import OrderedDict
+try:
+    from PySide2 import QtSvg
+except ImportError:
+    QtSvg = None
+from Paths import dataDir
+import hashlib
+import os
+import time
+
+path = os.path.dirname(__file__) + "/Resources/icons/"
+fallback = ":/icons/freecad"
+
+# Rasterized pixmaps unused for MAX_AGE days are removed at startup,
+# and at most MAX_FILES of the most recently used ones are kept.
+MAX_AGE = 30
+MAX_FILES = 4000
+
+
+def parseXpm(source):
+    """
+    Return XPM rows of an XPM source string.
+    """
+    rows = []
+    for a in ((((source
+                .split('{', 1)[1])
+                .rsplit('}', 1)[0])
+            .strip())
+            .split("\n")):
+        rows.append((a
+                    .split('"', 1)[1])
+                    .rsplit('"', 1)[0])
+    return rows
+
+
+def sourceHash(source):
+    """
+    Return hash of an icon source, file sources include their modification time.
+    """
+    key = source
+    if "XPM" not in source and os.path.isfile(source):
+        stat = os.stat(source)
+        key = "%s|%d|%d" % (source, stat.st_mtime_ns, stat.st_size)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def pruneFolder(folder, maxAge=MAX_AGE, maxFiles=MAX_FILES):
+    """
+    Remove old rasterized pixmaps, keeping the most recently used ones.
+    """
+    try:
+        entries = [(e.stat().st_mtime, e.path) for e in os.scandir(folder) if e.name.endswith(".png")]
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    limit = time.time() - maxAge * 86400
+    for i, (mtime, fileName) in enumerate(entries):
+        if i < maxFiles and mtime >= limit: continue
+        try:
+            os.remove(fileName)
+        except OSError:
+            pass
+
+
+def touch(fileName):
+    """
+    Mark a cached pixmap as used.
+    """
+    try:
+        os.utime(fileName)
+    except OSError:
+        pass
+
+
+def renderImage(source, pixels):
+    """
+    Render an XPM string or an image file to a QImage, safe to call from any thread.
+    """
+    if "XPM" in source:
+        image = QtGui.QImage.fromData(QtCore.QByteArray(source.encode("utf-8")), "XPM")
+        if image.isNull():
+            image = QtGui.QImage(parseXpm(source))
+    elif QtSvg and source.lower().endswith(".svg"):
+        renderer = QtSvg.QSvgRenderer(source)
+        if not renderer.isValid(): return QtGui.QImage()
+        image = QtGui.QImage(pixels, pixels, QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(image)
+        renderer.render(painter)
+        painter.end()
+        return image
+    else:
+        image = QtGui.QImage(source)
+    if image.isNull(): return image
+    return image.scaled(pixels, pixels,
+        QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+
+class RasterReceiver(QtCore.QObject):
+    """
+    Carries rendered images from worker threads to the GUI thread.
+    """
+    done = QtCore.Signal(object, QtGui.QImage)
+
+
+class RasterTask(QtCore.QRunnable):
+    """
+    Render one icon on the thread pool.
+    """
+
+    def __init__(self, key, source, pixels, fileName, receiver):
+        """
+        Constructor
+        """
+        super(RasterTask, self).__init__()
+        self.key = key
+        self.source = source
+        self.pixels = pixels
+        self.fileName = fileName
+        self.receiver = receiver
+
+    def run(self):
+        """
+        Load the cached PNG or render the source and cache it.
+        """
+        image = QtGui.QImage()
+        try:
+            if os.path.isfile(self.fileName) and image.load(self.fileName):
+                touch(self.fileName)
+            if image.isNull():
+                image = renderImage(self.source, self.pixels)
+                if not image.isNull(): image.save(self.fileName, "PNG")
+        except Exception:
+            image = QtGui.QImage()
+        self.receiver.done.emit(self.key, image)
+
+
+class PruneTask(QtCore.QRunnable):
+    """
+    Prune the pixmap folder on the thread pool.
+    """
+
+    def __init__(self, folder):
+        """
+        Constructor
+        """
+        super(PruneTask, self).__init__()
+        self.folder = folder
+
+    def run(self):
+        """
+        Remove old pixmaps.
+        """
+        pruneFolder(self.folder)
+
+
+class IconService:
+    """
+    Memoized icon decoding with a disk-backed pixmap cache.
+    """
+
+    def __init__(self, capacity=512, folder=None):
+        """
+        Constructor
+        """
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._folder = folder
+        self._waiting = {}
+        self._ready = []
+        self._receiver = RasterReceiver()
+        self._receiver.done.connect(self._handleRasterDone)
+        self._pool = QtCore.QThreadPool.globalInstance()
+
+    def folder(self):
+        """
+        Return the folder of rasterized pixmaps.
+        """
+        if self._folder is None:
+            self._folder = os.path.join(dataDir(), "icons")
+            if not os.path.isdir(self._folder):
+                os.makedirs(self._folder)
+            self._pool.start(PruneTask(self._folder))
+        return self._folder
+
+    def devicePixelRatio(self):
+        """
+        Return device pixel ratio of the application.
+        """
+        app = QtWidgets.QApplication.instance()
+        try:
+            return app.devicePixelRatio()
+        except Exception:
+            return 1.0
+
+    def _get(self, key):
+        """
+        Return cached icon and mark it as recently used.
+        """
+        icon = self._cache.get(key)
+        if icon is not None: self._cache.move_to_end(key)
+        return icon
+
+    def _put(self, key, icon):
+        """
+        Cache icon and drop least recently used ones.
+        """
+        self._cache[key] = icon
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def pixmap(self, source, size=32):
+        """
+        Return source rasterized at size for the current device pixel ratio.
+        """
+        dpr = self.devicePixelRatio()
+        pixels = int(round(size * dpr))
+        digest = sourceHash(source)
+        fileName = os.path.join(self.folder(), "%s_%d.png" % (digest, pixels))
+
+        pixmap = QtGui.QPixmap()
+        if os.path.isfile(fileName) and pixmap.load(fileName):
+            touch(fileName)
+            pixmap.setDevicePixelRatio(dpr)
+            return pixmap
+
+        try:
+            image = renderImage(source, pixels)
+        except Exception:
+            return QtGui.QPixmap()
+        if image.isNull(): return pixmap
+        image.save(fileName, "PNG")
+        pixmap = QtGui.QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+
+    def placeholder(self):
+        """
+        Return icon shown until the real one is rasterized.
+        """
+        key = ("placeholder", 0, 0)
+        icon = self._get(key)
+        if icon is not None: return icon
+        pixmap = QtGui.QPixmap(16, 16)
+        pixmap.fill(QtCore.Qt.transparent)
+        icon = QtGui.QIcon(pixmap)
+        self._put(key, icon)
+        return icon
+
+    def requestIcon(self, source, callback, size=32):
+        """
+        Rasterize source on the thread pool and pass the icon to callback.
+        Callback is called right away when the icon is already cached.
+        """
+        dpr = self.devicePixelRatio()
+        key = (sourceHash(source), size, dpr)
+        icon = self._get(key)
+        if icon is not None:
+            callback(icon)
+            return
+        waiting = self._waiting.setdefault(key, [])
+        waiting.append(callback)
+        if len(waiting) > 1: return
+        pixels = int(round(size * dpr))
+        fileName = os.path.join(self.folder(), "%s_%d.png" % (key[0], pixels))
+        self._pool.start(RasterTask(key, source, pixels, fileName, self._receiver))
+
+    def _handleRasterDone(self, key, image):
+        """
+        Queue a rendered image, pixmaps are created in batches.
+        """
+        self._ready.append((key, image))
+        if len(self._ready) == 1:
+            QtCore.QTimer.singleShot(0, self._flushRasterized)
+
+    def _flushRasterized(self):
+        """
+        Convert rendered images to icons and hand them to the callbacks.
+        """
+        ready, self._ready = self._ready, []
+        for key, image in ready:
+            if image.isNull():
+                icon = QtGui.QIcon(fallback)
+            else:
+                pixmap = QtGui.QPixmap.fromImage(image)
+                pixmap.setDevicePixelRatio(key[2])
+                icon = QtGui.QIcon(pixmap)
+            self._put(key, icon)
+            for callback in self._waiting.pop(key, []):
+                try:
+                    callback(icon)
+                except Exception:
+                    pass
+
+    def workbenchIcon(self, source, size=32):
+        """
+        Return workbench icon from its XPM string or file path.
+        """
+        key = (sourceHash(source), size, self.devicePixelRatio())
+        icon = self._get(key)
+        if icon is not None: return icon
+        icon = QtGui.QIcon(self.pixmap(source, size))
+        if icon.isNull():
+            icon = QtGui.QIcon(fallback)
+        self._put(key, icon)
+        return icon
+
+    def resourceIcon(self, name):
+        """
+        Return icon from the Modern UI resources.
+        """
+        key = (sourceHash(path + name), 0, self.devicePixelRatio())
+        icon = self._get(key)
+        if icon is not None: return icon
+        icon = QtGui.QIcon(path + name)
+        self._put(key, icon)
+        return icon
+
+    def commandIcon(self, pixmap):
+        """
+        Return icon of a command pixmap reference.
+        """
+        key = (sourceHash(pixmap), 0, self.devicePixelRatio())
+        icon = self._get(key)
+        if icon is not None: return icon
+        icon = self._commandIcon(pixmap)
+        self._put(key, icon)
+        return icon
+
+    def requestCommandIcon(self, pixmap, callback):
+        """
+        Pass icon of a command pixmap reference to callback, image files
+        are rasterized on the thread pool.
+        """
+        if os.path.isfile(pixmap):
+            self.requestIcon(pixmap, callback)
+        else:
+            callback(self.commandIcon(pixmap))
+
+    def _commandIcon(self, pixmap):
+        """
+        Resolve a command pixmap reference.
+        """
+        if os.path.isfile(pixmap):
+            return QtGui.QIcon(pixmap)
+        if pixmap:
+            try:
+                import FreeCADGui
+                icon = FreeCADGui.getIcon(pixmap)
+                if icon and not icon.isNull(): return icon
+            except Exception:
+                pass
+            for name in (pixmap, pixmap + ".svg"):
+                icon = QtGui.QIcon(":/icons/" + name)
+                if not icon.isNull(): return icon
+        return QtGui.QIcon(fallback)
+
+
+icons = IconService()
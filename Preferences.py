@@ -23,7 +23,8 @@
 
 import FreeCADGui, FreeCAD
 from PySide2 import QtCore, QtGui, QtWidgets
-import os
+from Icons import icons
+from Settings import settings
 
 class Preferences(QtWidgets.QDialog):
     """
@@ -33,7 +34,6 @@ class Preferences(QtWidgets.QDialog):
     mw = FreeCADGui.getMainWindow()
     group = QtWidgets.QActionGroup(mw)
     p = FreeCAD.ParamGet("User parameter:BaseApp/ModernUI")
-    path = os.path.dirname(__file__) + "/Resources/icons/"
 
     def __init__(self):
         self.workbenchActions()
@@ -86,6 +86,70 @@ class Preferences(QtWidgets.QDialog):
         CollapsGB = QtWidgets.QGroupBox("Collapsible Docks:")
         CollapsGB.setLayout(CollapsLay)
 
+        # Create browse tabs options
+        browseOnRB = QtWidgets.QRadioButton("On")
+        browseOffRB = QtWidgets.QRadioButton("Off")
+        browseLay = QtWidgets.QVBoxLayout()
+        browseLay.addWidget(browseOnRB)
+        browseLay.addWidget(browseOffRB)
+        browseGB = QtWidgets.QGroupBox("Browse Tabs:")
+        browseGB.setToolTip("Activate the workbench of a tab only when one of its commands is used")
+        browseGB.setLayout(browseLay)
+
+        # Create painted buttons options
+        paintedOnRB = QtWidgets.QRadioButton("On")
+        paintedOffRB = QtWidgets.QRadioButton("Off")
+        paintedLay = QtWidgets.QVBoxLayout()
+        paintedLay.addWidget(paintedOnRB)
+        paintedLay.addWidget(paintedOffRB)
+        paintedGB = QtWidgets.QGroupBox("Painted Buttons:")
+        paintedGB.setToolTip("Draw the buttons of each ribbon section without a widget for every button")
+        paintedGB.setLayout(paintedLay)
+
+        # Create built tabs options
+        tabCacheSB = QtWidgets.QSpinBox()
+        tabCacheSB.setRange(1, 100)
+        tabCacheLay = QtWidgets.QFormLayout()
+        tabCacheLay.addRow("Keep:", tabCacheSB)
+        tabCacheGB = QtWidgets.QGroupBox("Built Tabs:")
+        tabCacheGB.setToolTip("Number of tabs kept built, the least recently used ones are rebuilt when opened")
+        tabCacheGB.setLayout(tabCacheLay)
+
+        # Create overlay dock options
+        overlayOnRB = QtWidgets.QRadioButton("On")
+        overlayOffRB = QtWidgets.QRadioButton("Off")
+        overlayLay = QtWidgets.QVBoxLayout()
+        overlayLay.addWidget(overlayOnRB)
+        overlayLay.addWidget(overlayOffRB)
+        overlayGB = QtWidgets.QGroupBox("Overlay Docks:")
+        overlayGB.setLayout(overlayLay)
+
+        # Create report view options
+        errorRB = QtWidgets.QRadioButton("Error")
+        warningRB = QtWidgets.QRadioButton("Warning")
+        reportOffRB = QtWidgets.QRadioButton("Off")
+        reportLay = QtWidgets.QVBoxLayout()
+        reportLay.addWidget(errorRB)
+        reportLay.addWidget(warningRB)
+        reportLay.addWidget(reportOffRB)
+        reportGB = QtWidgets.QGroupBox("Open Report View On:")
+        reportGB.setLayout(reportLay)
+
+        # Create dock delay options
+        hoverSB = QtWidgets.QSpinBox()
+        hoverSB.setRange(0, 2000)
+        hoverSB.setSingleStep(50)
+        hoverSB.setSuffix(" ms")
+        leaveSB = QtWidgets.QSpinBox()
+        leaveSB.setRange(0, 2000)
+        leaveSB.setSingleStep(50)
+        leaveSB.setSuffix(" ms")
+        delayLay = QtWidgets.QFormLayout()
+        delayLay.addRow("Open:", hoverSB)
+        delayLay.addRow("Close:", leaveSB)
+        delayGB = QtWidgets.QGroupBox("Dock Delays:")
+        delayGB.setLayout(delayLay)
+
         # Create empty layout
         emptyLay = QtWidgets.QHBoxLayout()
         emptyLay.addStretch()
@@ -95,7 +159,13 @@ class Preferences(QtWidgets.QDialog):
         prefLay.addWidget(styleGB)
         prefLay.addWidget(sizeGB)
         prefLay.addWidget(rowNumGB)
+        prefLay.addWidget(browseGB)
+        prefLay.addWidget(paintedGB)
+        prefLay.addWidget(tabCacheGB)
         prefLay.addWidget(CollapsGB)
+        prefLay.addWidget(overlayGB)
+        prefLay.addWidget(reportGB)
+        prefLay.addWidget(delayGB)
         prefLay.addStretch()
         prefLay.insertLayout(0, emptyLay)
 
@@ -107,12 +177,12 @@ class Preferences(QtWidgets.QDialog):
         # Create Up button
         upBtn = QtWidgets.QPushButton()
         upBtn.setToolTip("Move selected item up")
-        upBtn.setIcon(QtGui.QIcon(self.path + "MoveUp"))
+        upBtn.setIcon(icons.resourceIcon("MoveUp"))
         
         # Create Down button
         downBtn = QtWidgets.QPushButton()
         downBtn.setToolTip("Move selected item down")
-        downBtn.setIcon(QtGui.QIcon(self.path + "MoveDown"))
+        downBtn.setIcon(icons.resourceIcon("MoveDown"))
 
         # Create buttons layout
         btnLay = QtWidgets.QHBoxLayout()
@@ -169,7 +239,7 @@ class Preferences(QtWidgets.QDialog):
                     item.setCheckState(QtCore.Qt.CheckState(2))
                     item.setData(50, "Checked")
 
-        style = self.p.GetString("IconStyle", "Icon and text")
+        style = settings.iconStyle
         if style == "Text":
             textRB.setChecked(True)
         elif style == "Icon":
@@ -177,26 +247,52 @@ class Preferences(QtWidgets.QDialog):
         else:
             iconTextRB.setChecked(True)
 
-        size = self.p.GetString("IconSize", "Small")
-        if size == "Small":
-            smallRB.setChecked(True)
-        else:
+        if settings.fullButtons:
             bigRB.setChecked(True)
+        else:
+            smallRB.setChecked(True)
 
-        numRow = self.p.GetString("NumberOfRows", "3")
-        if numRow == "3":
+        numRow = settings.numberOfRows
+        if numRow == 3:
             threeRB.setChecked(True)
-        elif numRow == "4":
+        elif numRow == 4:
             fourRB.setChecked(True)
         else:
             fiveRB.setChecked(True)
 
-        CollapsDock = self.p.GetString("CollapsibleDock", "On")
-        if CollapsDock == "On":
+        if settings.browseTabs:
+            browseOnRB.setChecked(True)
+        else:
+            browseOffRB.setChecked(True)
+
+        if settings.paintedButtons:
+            paintedOnRB.setChecked(True)
+        else:
+            paintedOffRB.setChecked(True)
+
+        tabCacheSB.setValue(settings.tabCache)
+
+        if settings.collapsibleDock:
             onRB.setChecked(True)
         else:
             offRB.setChecked(True)
 
+        if settings.overlayDocks:
+            overlayOnRB.setChecked(True)
+        else:
+            overlayOffRB.setChecked(True)
+
+        severity = settings.reportSeverity
+        if severity == "Warning":
+            warningRB.setChecked(True)
+        elif severity == "Off":
+            reportOffRB.setChecked(True)
+        else:
+            errorRB.setChecked(True)
+
+        hoverSB.setValue(settings.hoverDelay)
+        leaveSB.setValue(settings.leaveDelay)
+
         # Set connections
         iconRB.toggled.connect(self.onStyleChanged)
         textRB.toggled.connect(self.onStyleChanged)
@@ -206,8 +302,20 @@ class Preferences(QtWidgets.QDialog):
         threeRB.toggled.connect(self.onNORChanged)
         fourRB.toggled.connect(self.onNORChanged)
         fiveRB.toggled.connect(self.onNORChanged)
+        browseOnRB.toggled.connect(self.onBrowseChanged)
+        browseOffRB.toggled.connect(self.onBrowseChanged)
+        paintedOnRB.toggled.connect(self.onPaintedChanged)
+        paintedOffRB.toggled.connect(self.onPaintedChanged)
+        tabCacheSB.valueChanged.connect(self.onTabCacheChanged)
         onRB.toggled.connect(self.onCollapsChanged)
         offRB.toggled.connect(self.onCollapsChanged)
+        overlayOnRB.toggled.connect(self.onOverlayChanged)
+        overlayOffRB.toggled.connect(self.onOverlayChanged)
+        errorRB.toggled.connect(self.onReportChanged)
+        warningRB.toggled.connect(self.onReportChanged)
+        reportOffRB.toggled.connect(self.onReportChanged)
+        hoverSB.valueChanged.connect(self.onHoverDelayChanged)
+        leaveSB.valueChanged.connect(self.onLeaveDelayChanged)
         upBtn.clicked.connect(self.onUpClicked)
         downBtn.clicked.connect(self.onDownClicked)
         selector.itemChanged.connect(self.onItemChanged)
@@ -217,30 +325,13 @@ class Preferences(QtWidgets.QDialog):
         self.styleGB = styleGB
         self.sizeGB = sizeGB
         self.rowNumGB = rowNumGB
+        self.browseGB = browseGB
+        self.paintedGB = paintedGB
         self.CollapsGB = CollapsGB
+        self.overlayGB = overlayGB
+        self.reportGB = reportGB
         self.selector = selector
 
-    def workbenchIcon(self, i):
-        """
-        Create workbench icon.
-        """
-        if str(i.find("XPM")) != "-1":
-            icon = []
-            for a in ((((i
-                        .split('{', 1)[1])
-                        .rsplit('}', 1)[0])
-                    .strip())
-                    .split("\n")):
-                icon.append((a
-                            .split('"', 1)[1])
-                            .rsplit('"', 1)[0])
-            icon = QtGui.QIcon(QtGui.QPixmap(icon))
-        else:
-            icon = QtGui.QIcon(QtGui.QPixmap(i))
-        if icon.isNull():
-            icon = QtGui.QIcon(":/icons/freecad")
-        return icon
-
     def workbenchActions(self):
         """
         Create workbench actions.
@@ -253,7 +344,7 @@ class Preferences(QtWidgets.QDialog):
                 action.setText(wbList[i].MenuText)
                 action.setData(i)
                 try:
-                    action.setIcon(self.workbenchIcon(wbList[i].Icon))
+                    action.setIcon(icons.workbenchIcon(wbList[i].Icon))
                 except:
                     action.setIcon(QtGui.QIcon(":/icons/freecad"))
                 self.actions[i] = action
@@ -382,4 +473,58 @@ class Preferences(QtWidgets.QDialog):
         CollapsGB = self.CollapsGB
         for i in CollapsGB.findChildren(QtWidgets.QRadioButton):
             if i.isChecked():
-                self.p.SetString("CollapsibleDock", i.text())
\ No newline at end of file
+                self.p.SetString("CollapsibleDock", i.text())
+
+    def onBrowseChanged(self):
+        """
+        Set Modern Menu browse tabs.
+        """
+        browseGB = self.browseGB
+        for i in browseGB.findChildren(QtWidgets.QRadioButton):
+            if i.isChecked():
+                self.p.SetString("BrowseTabs", i.text())
+
+    def onPaintedChanged(self):
+        """
+        Set Modern Menu painted buttons.
+        """
+        paintedGB = self.paintedGB
+        for i in paintedGB.findChildren(QtWidgets.QRadioButton):
+            if i.isChecked():
+                self.p.SetString("PaintedButtons", i.text())
+
+    def onTabCacheChanged(self, value):
+        """
+        Set number of tabs kept built.
+        """
+        self.p.SetInt("TabCache", value)
+
+    def onOverlayChanged(self):
+        """
+        Set Modern Menu overlay docks.
+        """
+        overlayGB = self.overlayGB
+        for i in overlayGB.findChildren(QtWidgets.QRadioButton):
+            if i.isChecked():
+                self.p.SetString("OverlayDocks", i.text())
+
+    def onReportChanged(self):
+        """
+        Set lowest message severity that opens the report view.
+        """
+        reportGB = self.reportGB
+        for i in reportGB.findChildren(QtWidgets.QRadioButton):
+            if i.isChecked():
+                self.p.SetString("ReportSeverity", i.text())
+
+    def onHoverDelayChanged(self, value):
+        """
+        Set delay before a collapsed dock opens.
+        """
+        self.p.SetInt("HoverDelay", value)
+
+    def onLeaveDelayChanged(self, value):
+        """
+        Set delay before an opened dock collapses.
+        """
+        self.p.SetInt("LeaveDelay", value)
@@ -0,0 +1,104 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+import FreeCAD
+from PySide2 import QtCore
+from collections import OrderedDict
+import time
+import traceback
+
+
+class IdleScheduler(QtCore.QObject):
+    """
+    Run queued jobs in small steps while the GUI is idle.
+
+    A job is a generator, every yield marks a point where the scheduler
+    may return control to the event loop.
+    """
+
+    def __init__(self, budget=8, parent=None):
+        """
+        Constructor, budget is the time allowed for each tick in ms.
+        """
+        super(IdleScheduler, self).__init__(parent)
+        self.budget = budget / 1000.0
+        self._jobs = OrderedDict()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._tick)
+
+    def add(self, key, job):
+        """
+        Queue a job unless one with the same key is already queued.
+        """
+        if key in self._jobs: return
+        self._jobs[key] = job
+        self._timer.start()
+
+    def finish(self, key):
+        """
+        Run remaining steps of a queued job right away.
+        """
+        job = self._jobs.pop(key, None)
+        if job is None: return
+        try:
+            for _ in job: pass
+        except Exception:
+            self._report(key)
+
+    def cancel(self, key):
+        """
+        Drop a queued job.
+        """
+        job = self._jobs.pop(key, None)
+        if job is not None: job.close()
+
+    def clear(self):
+        """
+        Drop all queued jobs.
+        """
+        for key in list(self._jobs): self.cancel(key)
+        self._timer.stop()
+
+    def _report(self, key):
+        """
+        Print the traceback of a failed job.
+        """
+        FreeCAD.Console.PrintError("Modern UI: job {} failed\n{}".format(key, traceback.format_exc()))
+
+    def _tick(self):
+        """
+        Run job steps until the time budget is spent, the event loop
+        then handles input before the next tick.
+        """
+        deadline = time.perf_counter() + self.budget
+        while self._jobs:
+            key = next(iter(self._jobs))
+            try:
+                next(self._jobs[key])
+            except StopIteration:
+                self._jobs.pop(key, None)
+            except Exception:
+                self._jobs.pop(key, None)
+                self._report(key)
+            if time.perf_counter() >= deadline: break
+        if not self._jobs: self._timer.stop()
@@ -0,0 +1,92 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Interface state of the last session: dock pin states and sizes, the last
+ribbon tab and whether the ribbon was minimized. It is kept in memory while
+FreeCAD runs and written once when the main window closes.
+"""
+
+import FreeCADGui
+from Paths import dataDir
+import json
+import os
+
+
+class Session:
+    """
+    Session record stored in the user data dir.
+    """
+
+    def __init__(self, fileName=None):
+        """
+        Constructor
+        """
+        if fileName is None:
+            fileName = os.path.join(dataDir(), "session.json")
+        self.fileName = fileName
+        self._data = {"docks": {}}
+        try:
+            with open(self.fileName, "r") as f:
+                self._data.update(json.load(f))
+        except Exception:
+            pass
+
+    def save(self):
+        """
+        Write session record to disk.
+        """
+        temp = self.fileName + ".tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump(self._data, f)
+            os.replace(temp, self.fileName)
+        except Exception:
+            pass
+
+    def dock(self, name):
+        """
+        Return saved state of a dock or None.
+        """
+        return self._data["docks"].get(name)
+
+    def setDock(self, name, pinned, width, height):
+        """
+        Record state of a dock.
+        """
+        self._data["docks"][name] = {"pinned": pinned, "width": width, "height": height}
+
+    def value(self, key, default=None):
+        """
+        Return a saved value.
+        """
+        return self._data.get(key, default)
+
+    def setValue(self, key, value):
+        """
+        Record a value.
+        """
+        self._data[key] = value
+
+
+session = Session()
+FreeCADGui.getMainWindow().mainWindowClosed.connect(session.save)
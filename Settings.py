@@ -0,0 +1,106 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Typed view of the BaseApp/ModernUI parameter group. Values are read once
+and kept current by a parameter observer, so the interface reads Python
+attributes instead of the parameter store.
+"""
+
+import FreeCAD
+from PySide2 import QtCore
+
+
+def numberOfRows(p):
+    """
+    Return number of ribbon rows.
+    """
+    value = p.GetString("NumberOfRows", "3")
+    if value == "3":
+        return 3
+    elif value == "4":
+        return 4
+    return 5
+
+
+# Parameter name: (attribute name, reader)
+readers = {
+    "IconStyle": ("iconStyle", lambda p: p.GetString("IconStyle", "Icon and text")),
+    "IconSize": ("fullButtons", lambda p: p.GetString("IconSize", "Small") != "Small"),
+    "NumberOfRows": ("numberOfRows", numberOfRows),
+    "BrowseTabs": ("browseTabs", lambda p: p.GetString("BrowseTabs", "Off") == "On"),
+    "QuickAccess": ("quickAccess", lambda p: [c for c in p.GetString("QuickAccess", "").split(",") if c]),
+    "PaintedButtons": ("paintedButtons", lambda p: p.GetString("PaintedButtons", "Off") == "On"),
+    "TabCache": ("tabCache", lambda p: p.GetInt("TabCache", 10)),
+    "CollapsibleDock": ("collapsibleDock", lambda p: p.GetString("CollapsibleDock", "On") == "On"),
+    "OverlayDocks": ("overlayDocks", lambda p: p.GetString("OverlayDocks", "Off") == "On"),
+    "ReportSeverity": ("reportSeverity", lambda p: p.GetString("ReportSeverity", "Error")),
+    "HoverDelay": ("hoverDelay", lambda p: p.GetInt("HoverDelay", 150)),
+    "LeaveDelay": ("leaveDelay", lambda p: p.GetInt("LeaveDelay", 300)),
+}
+
+
+class ModernSettings(QtCore.QObject):
+    """
+    Modern UI preferences as typed attributes.
+    changed is emitted once for every parameter that changed.
+    """
+    changed = QtCore.Signal(str)
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super(ModernSettings, self).__init__()
+        self.p = FreeCAD.ParamGet("User parameter:BaseApp/ModernUI")
+        self._docks = {}
+        for key, (name, reader) in readers.items():
+            setattr(self, name, reader(self.p))
+        self.p.Attach(self)
+
+    def onChange(self, grp, key):
+        """
+        Parameter observer, update the changed attribute.
+        """
+        if key in readers:
+            name, reader = readers[key]
+            value = reader(self.p)
+            if value == getattr(self, name): return
+            setattr(self, name, value)
+            self.changed.emit(key)
+        elif key in self._docks:
+            value = self.p.GetString(key, "False") == "True"
+            if value == self._docks[key]: return
+            self._docks[key] = value
+            self.changed.emit(key)
+
+    def dockPinned(self, name):
+        """
+        Return pin state of a dock saved by older versions.
+        """
+        key = name + "status"
+        if key not in self._docks:
+            self._docks[key] = self.p.GetString(key, "False") == "True"
+        return self._docks[key]
+
+
+settings = ModernSettings()
@@ -0,0 +1,141 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Keeps a copy of every ribbon tab on disk, so a tab can be drawn
+before its workbench has been activated. It also keeps the modules the
+first activation of each workbench imported, importing them again
+registers the commands of the workbench without activating it.
+
+A tab layout is a list of sections:
+    [{"toolbar": name, "title": text, "buttons": [
+        {"command": name, "text": text, "icon": reference,
+         "menu": bool, "iconOnly": bool}, ...]}, ...]
+"""
+
+import FreeCAD
+from Paths import dataDir
+import json
+import os
+
+# Bump when the layout format or the way tabs are built changes.
+ADDON_VERSION = "0.1.0"
+SCHEMA = 2
+
+
+def freecadVersion():
+    """
+    Return FreeCAD version string.
+    """
+    return ".".join(FreeCAD.Version()[:4])
+
+
+class RibbonSnapshot:
+    """
+    Versioned on-disk store of ribbon tab layouts.
+    """
+
+    def __init__(self, fileName=None):
+        """
+        Constructor
+        """
+        if fileName is None:
+            fileName = os.path.join(dataDir(), "snapshot.json")
+        self.fileName = fileName
+        self._entries = {}
+        self._modules = {}
+        self._commands = None
+        self.load()
+
+    def load(self):
+        """
+        Read saved layouts from disk.
+        """
+        try:
+            with open(self.fileName, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("schema") != SCHEMA: return
+        self._entries = data.get("workbenches", {})
+        self._modules = data.get("modules", {})
+
+    def save(self):
+        """
+        Write layouts to disk.
+        """
+        data = {"schema": SCHEMA, "workbenches": self._entries, "modules": self._modules}
+        temp = self.fileName + ".tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump(data, f)
+            os.replace(temp, self.fileName)
+        except Exception:
+            pass
+
+    def layout(self, workbench):
+        """
+        Return saved layout of workbench or None if it is missing or stale.
+        """
+        entry = self._entries.get(workbench)
+        if not entry: return None
+        if entry.get("freecad") != freecadVersion(): return None
+        if entry.get("addon") != ADDON_VERSION: return None
+        return entry.get("sections")
+
+    def setLayout(self, workbench, layout):
+        """
+        Save layout of workbench.
+        """
+        if self.layout(workbench) == layout: return
+        self._commands = None
+        self._entries[workbench] = {
+            "freecad": freecadVersion(),
+            "addon": ADDON_VERSION,
+            "sections": layout}
+        self.save()
+
+    def modules(self, workbench):
+        """
+        Return modules imported by the first activation of workbench.
+        """
+        return self._modules.get(workbench, [])
+
+    def setModules(self, workbench, modules):
+        """
+        Save modules imported by the first activation of workbench.
+        """
+        if self._modules.get(workbench) == modules: return
+        self._modules[workbench] = modules
+        self.save()
+
+    def commands(self):
+        """
+        Return workbench and button entry of every saved command.
+        """
+        if self._commands is None:
+            self._commands = {}
+            for workbench in self._entries:
+                for section in self.layout(workbench) or []:
+                    for button in section["buttons"]:
+                        self._commands.setdefault(button["command"], (workbench, button))
+        return self._commands
@@ -0,0 +1,135 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Index of the main window toolbars, kept current through child events
+so tab switches do not have to walk the main window object tree.
+"""
+
+from PySide2 import QtCore, QtWidgets
+
+
+class ToolbarRegistry(QtCore.QObject):
+    """
+    Map toolbar object names to toolbars and their buttons.
+    changed is emitted and generation is increased whenever a toolbar
+    or one of its buttons is added or removed.
+    """
+    changed = QtCore.Signal()
+
+    def __init__(self, mw):
+        """
+        Constructor
+        """
+        super(ToolbarRegistry, self).__init__(mw)
+        self.mw = mw
+        self._toolbars = []
+        self._names = {}
+        self._buttons = {}
+        self._dirty = True
+        self.generation = 0
+
+        for child in mw.children():
+            if isinstance(child, QtWidgets.QToolBar): self._add(child)
+        mw.installEventFilter(self)
+
+    def _add(self, toolbar):
+        """
+        Start tracking a toolbar.
+        """
+        if toolbar in self._toolbars: return
+        self._toolbars.append(toolbar)
+        toolbar.objectNameChanged.connect(self._invalidate)
+        toolbar.installEventFilter(self)
+        self._invalidate()
+
+    def _remove(self, toolbar):
+        """
+        Stop tracking a toolbar.
+        """
+        if toolbar not in self._toolbars: return
+        self._toolbars.remove(toolbar)
+        self._buttons.pop(toolbar, None)
+        self._invalidate()
+
+    def _invalidate(self):
+        """
+        Rebuild the name index on next lookup.
+        """
+        self._dirty = True
+        self._touch()
+
+    def _touch(self):
+        """
+        Record a change of the toolbars.
+        """
+        self.generation += 1
+        self.changed.emit()
+
+    def eventFilter(self, source, event):
+        """
+        Track toolbars added to or removed from the main window and
+        buttons added to or removed from toolbars.
+        """
+        t = event.type()
+        if source is self.mw:
+            if t == QtCore.QEvent.ChildAdded or t == QtCore.QEvent.ChildPolished:
+                child = event.child()
+                if isinstance(child, QtWidgets.QToolBar): self._add(child)
+            elif t == QtCore.QEvent.ChildRemoved:
+                self._remove(event.child())
+        elif t == QtCore.QEvent.ActionAdded or t == QtCore.QEvent.ActionRemoved:
+            self._buttons.pop(source, None)
+            self._touch()
+        return False
+
+    def toolbars(self):
+        """
+        Return all toolbars of the main window.
+        """
+        return list(self._toolbars)
+
+    def toolbar(self, name):
+        """
+        Return toolbar with the given object name or None.
+        A toolbar created hidden is not polished, so it is still a plain
+        widget at ChildAdded and missed by the events, it is looked up
+        once by name and tracked from then on.
+        """
+        if self._dirty:
+            self._names = {tb.objectName(): tb for tb in self._toolbars}
+            self._dirty = False
+        toolbar = self._names.get(name)
+        if toolbar is None and name:
+            toolbar = self.mw.findChild(QtWidgets.QToolBar, name, QtCore.Qt.FindDirectChildrenOnly)
+            if toolbar is not None: self._add(toolbar)
+        return toolbar
+
+    def buttons(self, toolbar):
+        """
+        Return tool buttons of a toolbar.
+        """
+        buttons = self._buttons.get(toolbar)
+        if buttons is None:
+            buttons = toolbar.findChildren(QtWidgets.QToolButton)
+            self._buttons[toolbar] = buttons
+        return buttons
@@ -0,0 +1,98 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+import FreeCAD
+import time
+
+# Hours after which an old switch counts half as much as a new one.
+HALF_LIFE = 72.0
+
+
+def record(grp, name):
+    """
+    Count one use of name in parameter group.
+    """
+    grp.SetInt(name + "Count", grp.GetInt(name + "Count", 0) + 1)
+    grp.SetFloat(name + "Time", time.time())
+
+
+def score(grp, name):
+    """
+    Return use frequency of name weighted by recency.
+    """
+    count = grp.GetInt(name + "Count", 0)
+    if not count: return 0.0
+    hours = (time.time() - grp.GetFloat(name + "Time", 0.0)) / 3600.0
+    return count * 0.5 ** (max(hours, 0.0) / HALF_LIFE)
+
+
+def ranked(grp, names):
+    """
+    Return used names sorted from most to least likely.
+    """
+    scores = {name: score(grp, name) for name in names}
+    used = [name for name in names if scores[name] > 0]
+    return sorted(used, key=lambda name: scores[name], reverse=True)
+
+
+class UsageTracker:
+    """
+    Locally recorded workbench switch and command run frequency and recency.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.p = FreeCAD.ParamGet("User parameter:BaseApp/ModernUI/Usage")
+        self.commands = self.p.GetGroup("Commands")
+
+    def record(self, workbench):
+        """
+        Record a switch to workbench.
+        """
+        record(self.p, workbench)
+
+    def score(self, workbench):
+        """
+        Return switch frequency of workbench weighted by recency.
+        """
+        return score(self.p, workbench)
+
+    def ranked(self, workbenches):
+        """
+        Return used workbenches sorted from most to least likely.
+        """
+        return ranked(self.p, workbenches)
+
+    def recordCommand(self, command):
+        """
+        Record a run of command.
+        """
+        record(self.commands, command)
+
+    def rankedCommands(self):
+        """
+        Return commands that were run, from most to least frequent.
+        """
+        names = [key[:-5] for key in self.commands.GetInts() if key.endswith("Count")]
+        return ranked(self.commands, names)
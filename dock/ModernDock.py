@@ -28,23 +28,200 @@ When the mouse moves towards them, they become visible.
 import FreeCADGui,FreeCAD
 from PySide2 import QtCore, QtGui, QtWidgets
 from menu.common import createButton
-import os
+from Icons import icons
+from Settings import settings
+from Session import session
+import time
 
 mw = FreeCADGui.getMainWindow()
-params = FreeCAD.ParamGet("User parameter:BaseApp/ModernUI")
-path = os.path.dirname(__file__) + "/../Resources/icons/"
+manager = None
+
+# Dock states, docked docks are either collapsed or expanded
+Collapsed = "Collapsed"
+Expanded = "Expanded"
+Floating = "Floating"
+
+# Dock events that can change the state of a dock
+stateEvents = (QtCore.QEvent.Enter, QtCore.QEvent.Leave)
+
+class DockManager(QtCore.QObject):
+    """
+    Owns the ModernDock of every dock and watches the main window for new docks.
+    """
+
+    def __init__(self):
+        super(DockManager, self).__init__(mw)
+        self.controllers = {}
+        self.filtered = 0
+        self.handled = 0
+        self.windowEvents = 0
+        self.expanded = {}
+        self.intents = {}
+        self.timers = {}
+        self.report = None
+        mw.installEventFilter(self)
+        mw.mainWindowClosed.connect(self.onClose)
+        settings.changed.connect(self.onSettingChanged)
+
+    def onSettingChanged(self, key):
+        if key != "OverlayDocks": return
+        for controller in self.controllers.values():
+            controller.setOverlay(False)
+        self.expanded = {}
+
+    def add(self, dock):
+        if dock in self.controllers: return
+        if dock.windowTitle().replace('&', '') == "Modern Menu": return
+        # The controller registers itself before it collapses the dock
+        ModernDock(dock, self)
+
+    def controller(self, dock):
+        return self.controllers.get(dock)
+
+    def areaDocks(self, area):
+        return [dock for dock in self.controllers if mw.dockWidgetArea(dock) is area]
+
+    def hover(self, controller, entered):
+        """
+        Expand or collapse the area of a dock once the pointer
+        stayed inside or outside long enough.
+        """
+        area = mw.dockWidgetArea(controller.target)
+        timer = self.timers.get(area)
+        if timer is None:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda area=area: self.applyIntent(area))
+            self.timers[area] = timer
+
+        self.intents[area] = (controller, entered)
+        if entered == self.expanded.get(area, False):
+            timer.stop()
+            return
+        timer.start(settings.hoverDelay if entered else settings.leaveDelay)
+
+    def applyIntent(self, area):
+        """
+        Apply size constraints of all docks in an area together, Qt
+        coalesces the layout requests they post.
+        """
+        controller, entered = self.intents.pop(area)
+        if entered == self.expanded.get(area, False): return
+        self.expanded[area] = entered
+
+        # Overlays sit above the 3D view, leave the main window alone
+        if settings.overlayDocks:
+            for dockWid in self.areaDocks(area):
+                if not dockWid.isFloating():
+                    self.controllers[dockWid].setOverlay(entered)
+            return
+
+        for dockWid in self.areaDocks(area):
+            if dockWid.isFloating(): continue
+            if entered:
+                controller.openDock(dockWid)
+            else:
+                controller.collapsedDock(dockWid, area)
+
+    def expand(self, controller):
+        """
+        Expand the area of a dock right away.
+        """
+        area = mw.dockWidgetArea(controller.target)
+        timer = self.timers.get(area)
+        if timer is not None: timer.stop()
+        self.intents[area] = (controller, True)
+        self.applyIntent(area)
+
+    def stats(self):
+        """
+        Return number of dock events passed through and handled,
+        and number of main window events seen by the manager.
+        """
+        return {"filtered": self.filtered, "handled": self.handled,
+                "window": self.windowEvents}
+
+    def eventFilter(self, source, event):
+        self.windowEvents += 1
+        t = event.type()
+        if t == QtCore.QEvent.ChildAdded or t == QtCore.QEvent.ChildPolished:
+            if isinstance(event.child(), QtWidgets.QDockWidget):
+                self.add(event.child())
+        elif t == QtCore.QEvent.ChildRemoved:
+            self.controllers.pop(event.child(), None)
+        elif t == QtCore.QEvent.Close:
+            # Arrives before mainWindowClosed, so the session is saved after
+            self.rememberAll()
+        return False
+
+    def rememberAll(self):
+        """
+        Record pin state and size of every dock, pinned docks keep
+        the size the user gave them.
+        """
+        for dock, object in self.controllers.items():
+            if not object.autoHide and not dock.isFloating() and dock.isVisible():
+                object.orgWidth = dock.width()
+                object.orgHeight = dock.height()
+            object.remember()
+
+    def onClose(self):
+        mw.removeEventFilter(self)
+        self.controllers = {}
+        self.deleteLater()
+
+class DockOverlay(QtWidgets.QFrame):
+    """
+    Panel that shows the contents of a collapsed dock above the 3D view,
+    so opening a dock does not resize the viewport.
+    """
+
+    def __init__(self, controller):
+        super(DockOverlay, self).__init__(mw)
+        self.controller = controller
+        self.setFrameStyle(QtWidgets.QFrame.StyledPanel | QtWidgets.QFrame.Raised)
+        self.setAutoFillBackground(True)
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self.hide()
+
+    def place(self, dock, width, height):
+        geo = dock.geometry()
+        area = mw.dockWidgetArea(dock)
+        if area is QtCore.Qt.LeftDockWidgetArea:
+            rect = QtCore.QRect(geo.right() + 1, geo.top(), width, geo.height())
+        elif area is QtCore.Qt.RightDockWidgetArea:
+            rect = QtCore.QRect(geo.left() - width, geo.top(), width, geo.height())
+        elif area is QtCore.Qt.TopDockWidgetArea:
+            rect = QtCore.QRect(geo.left(), geo.bottom() + 1, geo.width(), height)
+        else:
+            rect = QtCore.QRect(geo.left(), geo.top() - height, geo.width(), height)
+        self.setGeometry(rect)
+
+    def enterEvent(self, event):
+        self.controller.manager.hover(self.controller, True)
+
+    def leaveEvent(self, event):
+        self.controller.manager.hover(self.controller, False)
 
 class ModernDock(QtCore.QObject):
     side = False
     docked = True
+    state = Collapsed
     target = None
     autoHide = 1
     title = None
     minimizeBtn = None
+    overlay = None
+    content = None
+    suspended = False
 
-    def __init__(self, dock):
+    def __init__(self, dock, manager):
         super(ModernDock, self).__init__(dock)
         self.setObjectName(dock.objectName()+"pin")
+        self.manager = manager
+        manager.controllers[dock] = self
 
         self.orgHeight = dock.sizeHint().height()
         self.orgWidth = dock.sizeHint().width()
@@ -57,7 +234,6 @@ class ModernDock(QtCore.QObject):
             tab.currentChanged.connect(self.pin)
 
         dock.installEventFilter(self)
-        mw.installEventFilter(self)
         area = mw.dockWidgetArea(dock)
         self.visible = dock.features()
 
@@ -69,13 +245,11 @@ class ModernDock(QtCore.QObject):
         title = QtWidgets.QLabel(dock.windowTitle())
         closeBtn = QtWidgets.QToolButton()
         closeBtn.setFixedSize(btnSize)
-        Icon = QtGui.QIcon(path+'Hide')
-        closeBtn.setIcon(Icon)
+        closeBtn.setIcon(icons.resourceIcon('Hide'))
         closeBtn.setIconSize(btnSize)
         closeBtn.clicked.connect(self.hide)
         minimizeBtn = QtWidgets.QToolButton()
-        Icon = QtGui.QIcon(path+'Pin')
-        minimizeBtn.setIcon(Icon)
+        minimizeBtn.setIcon(icons.resourceIcon('Pin'))
         minimizeBtn.setFixedSize(btnSize)
         minimizeBtn.clicked.connect(self.pin)
         layout = QtWidgets.QHBoxLayout()
@@ -90,29 +264,80 @@ class ModernDock(QtCore.QObject):
         self.target = dock
         self.title = title
 
+    def controller(self, dock):
+        return self.manager.controller(dock)
+
     def pin(self):
         area = mw.dockWidgetArea(self.target)
 
-        for dockWid in mw.findChildren(QtWidgets.QDockWidget):
-            if dockWid.isVisible and (mw.dockWidgetArea(dockWid) is area):
-                if self.autoHide or dockWid.isFloating():
-                    self.disableCollapsing(dockWid)
-                    params.SetString(self.objectName()+'status', 'True')
-                else:
-                    self.enableCollapsing(dockWid)
-                    params.SetString(self.objectName()+'status', 'False')
+        for dockWid in self.manager.areaDocks(area):
+            if self.autoHide or dockWid.isFloating():
+                self.disableCollapsing(dockWid)
+            else:
+                self.enableCollapsing(dockWid)
         self.autoHide = (self.autoHide + 1) % 2
+        self.remember()
+
+    def remember(self):
+        """Record pin state and expanded size in the session."""
+        session.setDock(self.objectName(), not self.autoHide, self.orgWidth, self.orgHeight)
     
     def onChange(self):
+        area = mw.dockWidgetArea(self.target)
+        if self.target.isFloating():
+            # Docks left behind take the space of a collapsed dock
+            if self.state == Collapsed:
+                for dockWid in self.manager.areaDocks(area):
+                    if dockWid.isFloating() == False:
+                        self.openDock(dockWid)
+            self.state = Floating
+        else:
+            self.state = Collapsed if self.docked else Expanded
+        if self.state != Collapsed: self.suspend(False)
+
         if self.autoHide and self.target.isFloating():
             self.disableCollapsing(self.target)
         else:
             self.enableCollapsing(self.target)
 
+    def setOverlay(self, shown):
+        dock = self.target
+        if shown:
+            if self.overlay is None: self.overlay = DockOverlay(self)
+            if self.content is None:
+                self.content = dock.widget()
+                if self.content is None: return
+                self.overlay.layout().addWidget(self.content)
+            self.suspend(False)
+            self.overlay.place(dock, self.orgWidth, self.orgHeight)
+            self.overlay.show()
+            self.overlay.raise_()
+        elif self.content is not None:
+            self.overlay.hide()
+            dock.setWidget(self.content)
+            self.content = None
+            if self.state == Collapsed: self.suspend(True)
+
+    def suspend(self, suspended):
+        """
+        Stop painting and laying out the contents of a collapsed dock,
+        they are shown and updated again when the dock opens.
+        """
+        content = self.content if self.content is not None else self.target.widget()
+        if content is None or suspended == self.suspended: return
+        self.suspended = suspended
+        if suspended:
+            content.setUpdatesEnabled(False)
+            content.hide()
+        else:
+            content.setUpdatesEnabled(True)
+            content.show()
+            content.update()
+
     def disableCollapsing(self, dock):
-        object = mw.findChildren(QtCore.QObject, dock.objectName()+"pin")[0]
-        Icon = QtGui.QIcon(path+'UnPin')
-        object.minimizeBtn.setIcon(Icon)
+        object = self.controller(dock)
+        object.setOverlay(False)
+        object.minimizeBtn.setIcon(icons.resourceIcon('UnPin'))
         self.openDock(dock)
         if dock.minimumWidth() < 300:
             dock.setMinimumSize(self.orgWidth,0)
@@ -123,69 +348,52 @@ class ModernDock(QtCore.QObject):
         except Exception: pass
         
     def enableCollapsing(self, dock):
-        object = mw.findChildren(QtCore.QObject, dock.objectName()+"pin")[0]
-        Icon = QtGui.QIcon(path+'Pin')
-        object.minimizeBtn.setIcon(Icon)
-        self.orgHeight = dock.size().height()
-        self.orgWidth = dock.size().width()
+        object = self.controller(dock)
+        object.minimizeBtn.setIcon(icons.resourceIcon('Pin'))
+        object.orgHeight = dock.size().height()
+        object.orgWidth = dock.size().width()
+        object.remember()
+        if not dock.isFloating():
+            self.manager.expanded[mw.dockWidgetArea(dock)] = object.state == Expanded
         try: dock.installEventFilter(object)
         except Exception: pass
 
     def eventFilter(self, source, event):
-        area = mw.dockWidgetArea(self.target)
+        # Only hovering changes the state of a docked dock
+        if event.type() not in stateEvents or source is not self.target \
+            or self.state == Floating:
+            self.manager.filtered += 1
+            return super(ModernDock, self).eventFilter(source, event)
 
-        if source is mw and event.type() is event.ChildAdded:
-            if isinstance(event.child(), QtWidgets.QDockWidget):
-                for dockWid in mw.findChildren(QtWidgets.QDockWidget):
-                    if dockWid.windowTitle().replace('&', '') == "Modern Menu":continue
-                    object = mw.findChildren(QtCore.QObject, dockWid.objectName()+"pin")
-                    if not object: ModernDock(dockWid)
-            return True
-
-        elif source is self.target:
-            if (event.type() is event.Enter) or \
-                (self.target.isFloating() and self.docked):
-                for dockWid in mw.findChildren(QtWidgets.QDockWidget):
-                    if dockWid.windowTitle().replace('&', '') == "Modern Menu":continue
-                    if dockWid.isVisible and (mw.dockWidgetArea(dockWid) is area):
-                        if dockWid.isFloating() == False:
-                            self.openDock(dockWid)
-                return True
-
-            elif event.type() is event.Leave:
-                for dockWid in mw.findChildren(QtWidgets.QDockWidget):
-                    if dockWid.windowTitle().replace('&', '') == "Modern Menu": continue
-                    if dockWid.isVisible and (mw.dockWidgetArea(dockWid) is area):
-                        if dockWid.isFloating() == False:
-                            self.collapsedDock(dockWid, area)
-                return True
-        """
-        elif event.type() is QtCore.QEvent.User:
-            report = mw.findChildren(QtWidgets.QDockWidget, "Report view")[0]
-            msgType = event.messageType()
-            if msgType == ReportHighlighter.Error or msgType == ReportHighlighter.Warning:
-                self.openDock(report)
-            return True
-        """
-        return super(ModernDock, self).eventFilter(source, event)
+        self.manager.handled += 1
+        self.manager.hover(self, event.type() == event.Enter)
+        return True
 
     def openDock(self, dock):
         dock.setFeatures(self.visible)
-        object = mw.findChildren(QtCore.QObject, dock.objectName()+"pin")[0]
+        object = self.controller(dock)
         title = dock.windowTitle().replace('&', '')
         object.title.setText(title)
         self.docked = False
+        if not dock.isFloating():
+            object.state = Expanded
+            self.manager.expanded[mw.dockWidgetArea(dock)] = True
+        object.suspend(False)
         self.modifyDock(dock, self.orgWidth, self.orgHeight)
 
     def collapsedDock(self, dock, area):
         self.side = False
         self.docked = True
         TBHeight = 24
+        object = self.controller(dock)
+        if not dock.isFloating():
+            object.state = Collapsed
+            self.manager.expanded[area] = False
+            if object.content is None: object.suspend(True)
 
         if (area is QtCore.Qt.LeftDockWidgetArea) or \
             (area is QtCore.Qt.RightDockWidgetArea):
             self.side = True
-            object = mw.findChildren(QtCore.QObject, dock.objectName()+"pin")[0]
             text = dock.windowTitle().replace('&', '')
             title = "\n".join(text) + " "
             object.title.setText(title)
@@ -212,14 +420,126 @@ class ModernDock(QtCore.QObject):
     def onClose(self):
         self.deleteLater()
 
+class ReportObserver(QtCore.QObject):
+    """
+    Opens the Report view when errors or warnings are reported.
+    A burst of messages opens it at most once.
+
+    The Report view does not expose message severities, so they are read
+    from the colors its highlighter uses, as set in the OutputWindow
+    preferences. Colors changed by a theme or stylesheet without those
+    preferences do not match, lines the highlighter left without any
+    format are then checked for the words errors and warnings start with.
+    """
+    # Message severities, the highlighter colors them from these parameters
+    # and their messages usually start with one of these words
+    severities = (("Error", "colorError", 0xFF000000, ("Error", "Exception", "<Exception>", "Traceback")),
+                  ("Warning", "colorWarning", 0xFFAA0000, ("Warning",)))
+
+    def __init__(self, controller):
+        super(ReportObserver, self).__init__(controller)
+        self.controller = controller
+        self.debounce = 250
+        self.maxWait = 1000
+        self.cooldown = 5.0
+        self.lastOpen = 0.0
+        self.burstStart = None
+
+        self.output = controller.target.findChildren(QtWidgets.QTextEdit)[0]
+        self.document = self.output.document()
+        self.lastBlock = self.document.blockCount()
+        self.document.contentsChange.connect(self.onContentsChange)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.onBurstEnd)
+
+    def onContentsChange(self, position, removed, added):
+        if settings.reportSeverity == "Off": return
+        now = time.time()
+        if self.burstStart is None:
+            self.burstStart = now
+        elif (now - self.burstStart) * 1000 > self.maxWait:
+            return
+        self.timer.start(self.debounce)
+
+    def colors(self):
+        """
+        Return highlighter colors and marker words of severities
+        at or above the threshold.
+        """
+        p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/OutputWindow")
+        colors = []
+        words = []
+        for name, param, default, markers in self.severities:
+            value = p.GetUnsigned(param, default)
+            colors.append(QtGui.QColor((value >> 24) & 0xFF, (value >> 16) & 0xFF, (value >> 8) & 0xFF))
+            words.extend(markers)
+            if name == settings.reportSeverity: break
+        return colors, words
+
+    def onBurstEnd(self):
+        self.burstStart = None
+        count = self.document.blockCount()
+        if self.lastBlock > count: self.lastBlock = 0
+        first, self.lastBlock = self.lastBlock, count
+        if time.time() - self.lastOpen < self.cooldown: return
+
+        colors, words = self.colors()
+        block = self.document.findBlockByNumber(max(first - 1, 0))
+        while block.isValid():
+            layout = block.layout()
+            try: ranges = layout.formats()
+            except AttributeError: ranges = layout.additionalFormats()
+            for r in ranges:
+                if r.format.foreground().color() in colors:
+                    self.open()
+                    return
+            if not ranges and block.text().lstrip().startswith(tuple(words)):
+                self.open()
+                return
+            block = block.next()
+
+    def open(self):
+        self.lastOpen = time.time()
+        dock = self.controller.target
+        if not dock.isVisible(): dock.show()
+        if dock.isFloating() or self.controller.state != Collapsed: return
+        self.controller.manager.expand(self.controller)
+
 def run():
+    global manager
+    manager = DockManager()
     for dock in mw.findChildren(QtWidgets.QDockWidget):
         #if dock.windowTitle() == "Report view":continue
-        if dock.windowTitle().replace('&', '') == "Modern Menu":continue
-        ModernDock(dock)
+        manager.add(dock)
 
-    for dock in mw.findChildren(QtWidgets.QDockWidget):
-        object = mw.findChildren(QtCore.QObject, dock.objectName()+"pin")
-        if object: 
-            pinned = params.GetString(object[0].objectName()+'status', 'False')
-            if pinned == 'True': object[0].pin()
+    # Restore the last session with painting stopped, pinning each area once
+    pinnedAreas = set()
+    mw.setUpdatesEnabled(False)
+    try:
+        for dock, object in list(manager.controllers.items()):
+            record = session.dock(object.objectName())
+            if record:
+                object.orgWidth = record.get("width", object.orgWidth)
+                object.orgHeight = record.get("height", object.orgHeight)
+                pinned = record.get("pinned", False)
+            else:
+                pinned = settings.dockPinned(object.objectName())
+            area = mw.dockWidgetArea(dock)
+            if pinned and area not in pinnedAreas:
+                pinnedAreas.add(area)
+                object.pin()
+            elif pinned:
+                # Its area is open already, only the dock's own state is restored
+                object.autoHide = 0
+                object.minimizeBtn.setIcon(icons.resourceIcon('UnPin'))
+                object.remember()
+            else:
+                object.remember()
+    finally:
+        mw.setUpdatesEnabled(True)
+
+    for dock, object in manager.controllers.items():
+        if dock.objectName() == "Report view" and dock.findChildren(QtWidgets.QTextEdit):
+            manager.report = ReportObserver(object)
@@ -41,12 +41,8 @@ class QFileMenu(QtWidgets.QMenu):
     A menu that acts like a standard modern File menu
     """
     
-    _arrowBtns = []
-    _panels = []
-    _recentFilesMgr = QRecentFilesManager()
     _recentFilesText = 'Recent files'
     _shortcutAdded = QtCore.Signal()
-    _shortcuts = []
     recentFileClicked = QtCore.Signal(str)
     
     def __init__(self):
@@ -55,7 +51,13 @@ class QFileMenu(QtWidgets.QMenu):
         """
         QtWidgets.QMenu.__init__(self)
         minHeight = 384
+        self._arrowBtns = []
+        self._panels = []
+        self._shortcuts = []
+        self._recentFilesMgr = QRecentFilesManager()
+        self._recentFilesMgr.setParent(self)
         self._recentFilesMgr.pathAdded.connect(self._populateRecentFilesPanel)
+        self._recentFilesMgr.pathsChanged.connect(self._populateRecentFilesPanel)
 
         # Create a button widget
         btnWidget = QtWidgets.QFrame()
@@ -99,7 +101,7 @@ class QFileMenu(QtWidgets.QMenu):
         # Add all of that as a widget action
         w = QtWidgets.QWidget()
         w.setLayout(mL)
-        wa = QtWidgets.QWidgetAction(None)
+        wa = QtWidgets.QWidgetAction(self)
         wa.setDefaultWidget(w)
         self.clear()
         self.addAction(wa)
@@ -116,6 +118,15 @@ class QFileMenu(QtWidgets.QMenu):
             w.setFrameStyle(QtWidgets.QFrame.Sunken | QtWidgets.QFrame.Box)
             w.setLineWidth(1)
 
+        # Panels built on first use
+        self._panelFactories = {}
+        self._arrowIdx = {}
+        self._hoverIdx = None
+        self._hoverTimer = QtCore.QTimer(self)
+        self._hoverTimer.setSingleShot(True)
+        self._hoverTimer.setInterval(150)
+        self._hoverTimer.timeout.connect(self._handleArrowBtnHovered)
+
         # Final setup stuff
         self._setDynContentRecentFiles()
         self.aboutToShow.connect(self._handleShow)
@@ -133,6 +144,8 @@ class QFileMenu(QtWidgets.QMenu):
         if not checked:
             self._dynContentStack.setCurrentIndex(0)
         else:
+            # Build the panel if this is its first use
+            self._createPanel(idx)
             # Deselect all other buttons
             for btnidx in range(len(self._arrowBtns)):
                 if btnidx == (idx-1): continue
@@ -140,6 +153,29 @@ class QFileMenu(QtWidgets.QMenu):
             # Update the dyn content stack
             self._dynContentStack.setCurrentIndex(idx)
 
+    def _handleArrowBtnHovered(self):
+        """
+        Build the panel of the arrow button the pointer rests on
+        """
+        if self._hoverIdx != None: self._createPanel(self._hoverIdx)
+
+    def _createPanel(self, idx):
+        """
+        Replace the placeholder at idx with the panel from its factory
+        """
+        factory = self._panelFactories.pop(idx, None)
+        if factory == None: return
+        placeholder = self._dynContentStack.widget(idx)
+        panel = factory()
+        self._dynContentStack.insertWidget(idx, panel)
+        self._dynContentStack.removeWidget(placeholder)
+        self._panels[self._panels.index(placeholder)] = panel
+        placeholder.deleteLater()
+
+        panel._shortcutAdded.connect(self._handleShortcutAddedToPanel)
+        for s in panel._shortcuts: self._shortcuts.append(s)
+        self._shortcutAdded.emit()
+
     def _handleRecentFileAdded(self):
         """
         Handle a new entry being added to self._recentFilesMgr
@@ -158,7 +194,8 @@ class QFileMenu(QtWidgets.QMenu):
         Handle a shortcut being added to a panel
         """
         for p in self._panels:
-            for s in p._shortcuts: self._shortcuts.append(s)
+            for s in getattr(p, '_shortcuts', []):
+                if s not in self._shortcuts: self._shortcuts.append(s)
         self._shortcutAdded.emit()
 
     def _handleShow(self):
@@ -292,8 +329,14 @@ class QFileMenu(QtWidgets.QMenu):
     def addArrowButton(self, panel, icon=None, title='', handler=None, shortcut=None, statusTip=None):
         """
         Add a button with an arrow to the bottom
+        panel can be a QFileMenuPanel or a function that returns one,
+        in which case the panel is built when it is first needed
         """
         btn = createButton(icon, title, handler, shortcut, statusTip)
+        factory = None
+        if not isinstance(panel, QtWidgets.QWidget):
+            factory = panel
+            panel = QtWidgets.QWidget()
         self._panels.append(panel)
 
         # Add an arrowbutton
@@ -309,6 +352,10 @@ class QFileMenu(QtWidgets.QMenu):
         # Add it to self.arrowBtns, and set up a handler
         idx = self._dynContentStack.addWidget(panel)
         arrowBtn.clicked.connect(lambda checked=True, idxarg=idx: self._handleArrowBtnClicked(checked, idxarg))
+        self._arrowIdx[arrowBtn] = idx
+        if factory != None:
+            self._panelFactories[idx] = factory
+            arrowBtn.installEventFilter(self)
 
         # Final setup
         L = QtWidgets.QHBoxLayout()
@@ -326,12 +373,26 @@ class QFileMenu(QtWidgets.QMenu):
             sh.activated.connect(lambda arg=btn: self._handleShortcut(arg))
             self._shortcuts.append(sh)
             self._shortcutAdded.emit()
-        panel._shortcutAdded.connect(self._handleShortcutAddedToPanel)
-        for s in panel._shortcuts: self._shortcuts.append(s)
-        self._shortcutAdded.emit()
+        if factory == None:
+            panel._shortcutAdded.connect(self._handleShortcutAddedToPanel)
+            for s in panel._shortcuts: self._shortcuts.append(s)
+            self._shortcutAdded.emit()
         
         return w
 
+    def eventFilter(self, source, event):
+        """
+        Start building a lazy panel when the pointer rests on its arrow button
+        """
+        if source in self._arrowIdx:
+            if event.type() == QtCore.QEvent.Enter:
+                self._hoverIdx = self._arrowIdx[source]
+                self._hoverTimer.start()
+            elif event.type() == QtCore.QEvent.Leave:
+                self._hoverIdx = None
+                self._hoverTimer.stop()
+        return QtWidgets.QMenu.eventFilter(self, source, event)
+
     def addSeparator(self):
         """
         Add a separator to the bottom
@@ -361,6 +422,7 @@ class QFileMenu(QtWidgets.QMenu):
         if not isinstance(manager, QRecentFilesManager): return False
         self._recentFilesMgr = manager
         manager.pathAdded.connect(self._handleRecentFileAdded)
+        manager.pathsChanged.connect(self._handleRecentFileAdded)
 
         self._populateRecentFilesPanel()
         self._dynContentStack.setCurrentIndex(0)
@@ -384,13 +446,13 @@ class QFileMenuPanel(QtWidgets.QWidget):
     """
     
     _shortcutAdded = QtCore.Signal()
-    _shortcuts = []
     
     def __init__(self, title=''):
         """
         Initialize the QFileMenuPanel
         """
         QtWidgets.QWidget.__init__(self)
+        self._shortcuts = []
 
         sp = self.sizePolicy()
         sp.setVerticalPolicy(sp.Expanding)
@@ -23,6 +23,7 @@
 
 # Contains classes related to the modern menu itself
 from PySide2 import QtCore, QtGui, QtWidgets
+import shiboken2
 from menu.common import createVertLine
 from menu.FileMenu import QFileMenu
 import sys
@@ -36,7 +37,6 @@ class QModernMenu(QtWidgets.QWidget):
     
     _helpMenu = None
     _helpIcon = None
-    _tabs = [None]
     _tabBarIdx = 1
     _tabChanging = False
     _tabHidden = False
@@ -47,6 +47,8 @@ class QModernMenu(QtWidgets.QWidget):
         """
         QtWidgets.QWidget.__init__(self)
         self.setFocusPolicy(Qt.ClickFocus)
+        self._tabs = [None]
+        self._factories = {}
 
         # Create a tab bar
         self._tabBar = QtWidgets.QTabBar()
@@ -61,6 +63,11 @@ class QModernMenu(QtWidgets.QWidget):
         # Create a file menu
         self._QFileMenu = QFileMenu()
 
+        # Create a quick access bar
+        self._quickBar = QtWidgets.QToolBar()
+        self._quickBar.setIconSize(QtCore.QSize(16, 16))
+        self._quickBar.setToolButtonStyle(Qt.ToolButtonIconOnly)
+
         # Create a minimize button
         self._minBtn = QtWidgets.QToolButton()
         self._minBtn.setAutoRaise(True)
@@ -81,8 +88,9 @@ class QModernMenu(QtWidgets.QWidget):
         tbLayout.setContentsMargins(0, 0, 0, 0)
         tbLayout.setSpacing(0)
         tbLayout.addWidget(self._tabBar,  0, 0)
-        tbLayout.addWidget(self._minBtn,  0, 1)
-        tbLayout.addWidget(self._helpBtn, 0, 2)
+        tbLayout.addWidget(self._quickBar, 0, 1)
+        tbLayout.addWidget(self._minBtn,  0, 2)
+        tbLayout.addWidget(self._helpBtn, 0, 3)
         tbLayout.setColumnStretch(0, 1)
         tbWidget = QtWidgets.QWidget()
         tbWidget.setLayout(tbLayout)
@@ -117,6 +125,7 @@ class QModernMenu(QtWidgets.QWidget):
             self._tabBar.setCurrentIndex(self._tabBarIdx)
             self._tabChanging = False
         else:
+            if idx > 0: self.tab(idx)
             self._stack.setCurrentIndex(idx - 1)
             self._tabBarIdx = idx
 
@@ -147,9 +156,9 @@ class QModernMenu(QtWidgets.QWidget):
             self._minMenuLayout.addWidget(self._stack)
             w = QtWidgets.QWidget()
             w.setLayout(self._minMenuLayout)
-            wa = QtWidgets.QWidgetAction(None)
-            wa.setDefaultWidget(w)
             self._minMenu.clear()
+            wa = QtWidgets.QWidgetAction(self._minMenu)
+            wa.setDefaultWidget(w)
             self._minMenu.addAction(wa)
             self._widgetAction = wa # prevents bugs
 
@@ -191,13 +200,16 @@ class QModernMenu(QtWidgets.QWidget):
         except: return
         self.tabBar.setTabText(idx, newTitle)
 
-    def addTab(self, icon, title):
+    def quickAccessBar(self):
         """
-        Add a tab to the end of the modern menu
+        Return the tool bar beside the tab bar
+        """
+        return self._quickBar
+
+    def _createPage(self, tab):
+        """
+        Return the scroll area that shows a tab in the widget stack
         """
-        tab = QModernTab(title)
-        self._tabs.append(tab)
-        self._tabBar.addTab(icon, title)
         tab._titleChanged.connect(self._tabTitleChanged)
         tab._shortcutAdded.connect(self._handleShortcutAdded)
         #self._handleShortcutAdded()
@@ -207,7 +219,25 @@ class QModernMenu(QtWidgets.QWidget):
         scrl.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         scrl.setWidget(tab)
         scrl.setWidgetResizable(True)
-        self._stack.addWidget(scrl)
+        return scrl
+
+    def addTab(self, icon, title, factory=None):
+        """
+        Add a tab to the end of the modern menu
+        With a factory, only a placeholder is added and the tab
+        is created by factory(title) when it is first needed
+        """
+        if factory == None:
+            tab = QModernTab(title)
+            page = None
+        else:
+            tab = None
+            page = QtWidgets.QWidget()
+            self._factories[len(self._tabs)] = (factory, title)
+        self._tabs.append(tab)
+        self._tabBar.addTab(icon, title)
+        if page == None: page = self._createPage(tab)
+        self._stack.addWidget(page)
 
         if len(self._tabs) == 2:
             self._tabChanging = True
@@ -216,6 +246,44 @@ class QModernMenu(QtWidgets.QWidget):
             self._stack.setCurrentIndex(0)
         return tab
 
+    def tab(self, idx):
+        """
+        Return the tab at the given index, creating it if it
+        was added with a factory and has not been created yet
+        """
+        tab = self._tabs[idx]
+        if tab == None and idx in self._factories:
+            factory, title = self._factories.pop(idx)
+            tab = factory(title)
+            self._tabs[idx] = tab
+
+            # Swap the placeholder for the tab
+            placeholder = self._stack.widget(idx - 1)
+            current = self._stack.currentWidget() is placeholder
+            page = self._createPage(tab)
+            self._stack.insertWidget(idx - 1, page)
+            self._stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            if current: self._stack.setCurrentWidget(page)
+        return tab
+
+    def releaseTab(self, idx, factory):
+        """
+        Destroy the tab at the given index and put a placeholder in
+        its place, the tab is created again by factory(title) when needed
+        """
+        tab = self._tabs[idx]
+        if tab == None: return
+        placeholder = QtWidgets.QWidget()
+        page = self._stack.widget(idx - 1)
+        current = self._stack.currentWidget() is page
+        self._stack.insertWidget(idx - 1, placeholder)
+        self._stack.removeWidget(page)
+        page.deleteLater()
+        if current: self._stack.setCurrentWidget(placeholder)
+        self._tabs[idx] = None
+        self._factories[idx] = (factory, tab.title())
+
     def helpIcon(self):
         """
         Return the help button icon
@@ -242,8 +310,12 @@ class QModernMenu(QtWidgets.QWidget):
 
     def setFileMenu(self, menu):
         """
-        Sets the file menu
+        Sets the file menu, the previous one is disconnected so a
+        menu set again is not connected twice
         """
+        if self._QFileMenu != None:
+            try: self._QFileMenu._shortcutAdded.disconnect(self._handleShortcutAdded)
+            except Exception: pass
         self._QFileMenu = menu
         self._QFileMenu._shortcutAdded.connect(self._handleShortcutAdded)
         self._handleShortcutAdded()
@@ -290,18 +362,20 @@ class QModernTab(QtWidgets.QWidget):
     """
 
     _orientation = Qt.Horizontal
-    _sections = []
     _shortcutAdded = QtCore.Signal()
     _title = ''
     _titleChanged = QtCore.Signal()
     
-    def __init__(self, title):
+    def __init__(self, title, sectionClass=None):
         """
         Initialize the QModernTab
+        sectionClass creates the sections, QModernSection by default
         """
         QtWidgets.QWidget.__init__(self)
 
         self._title = title
+        self._sections = []
+        self._sectionClass = sectionClass
 
         self._mainLayout = QtWidgets.QHBoxLayout()
         self._mainLayout.setContentsMargins(4, 4, 4, 4)
@@ -333,7 +407,8 @@ class QModernTab(QtWidgets.QWidget):
         """
         Add a QModernSection to the end
         """
-        section = QModernSection(title, numRow)
+        sectionClass = self._sectionClass or QModernSection
+        section = sectionClass(title, numRow)
         self._sections.append(section)
 
         section._shortcutAdded.connect(self._handleShortcutAdded)
@@ -351,6 +426,41 @@ class QModernTab(QtWidgets.QWidget):
 
         return section
 
+    def clearSections(self):
+        """
+        Remove all QModernSections
+        """
+        while self._mainLayout.count():
+            item = self._mainLayout.takeAt(0)
+            w = item.widget()
+            if w != None: w.deleteLater()
+        self._sections = []
+
+    def moveSection(self, section, index):
+        """
+        Move a QModernSection to the given position
+        """
+        i = self._sections.index(section)
+        if i == index: return
+        vline = self._mainLayout.itemAt(2*i + 1).widget()
+        self._mainLayout.removeWidget(section)
+        self._mainLayout.removeWidget(vline)
+        self._sections.insert(index, self._sections.pop(i))
+        self._mainLayout.insertWidget(2*index, section)
+        self._mainLayout.insertWidget(2*index + 1, vline)
+
+    def removeSection(self, section):
+        """
+        Remove a QModernSection
+        """
+        i = self._sections.index(section)
+        vline = self._mainLayout.itemAt(2*i + 1).widget()
+        self._mainLayout.removeWidget(section)
+        self._mainLayout.removeWidget(vline)
+        section.deleteLater()
+        vline.deleteLater()
+        self._sections.pop(i)
+
     def orientation(self):
         """
         Return the orientation that will be used for
@@ -393,10 +503,7 @@ class QModernSection(QtWidgets.QWidget):
     A widget that acts like a modern menu tab shortcut container
     """
     
-    _widgetRow = 0
-    _widgetCol = 0
     _shortcutAdded = QtCore.Signal()
-    _shortcuts = []
     _rowNum = 3
     
     def __init__(self, title, numRow):
@@ -410,8 +517,11 @@ class QModernSection(QtWidgets.QWidget):
         # affect self._titleLabel
 
         self._rowNum = numRow
+        self._items = []
+        self._buttons = []
+        self._shortcuts = []
 
-        self._mainLayout = QtWidgets.QGridLayout()
+        self._mainLayout = QRibbonLayout(numRow)
         self._mainLayout.setContentsMargins(0, 0, 0, 0)
         self._mainLayout.setSpacing(0)
 
@@ -428,21 +538,10 @@ class QModernSection(QtWidgets.QWidget):
         Add a widget to the end
         """
         # "full" is a bool specifying if this widget
-        # should span all 3 layout rows or not.
+        # should span all layout rows or not.
 
-        rowspan = self._rowNum if full else 1
-        if full and (self._widgetRow in [1, self._rowNum-1]):
-            self._widgetRow = 0
-            self._widgetCol += 1
-        self._mainLayout.addWidget(widget, self._widgetRow, self._widgetCol, rowspan, 1)
-        if full:
-            self._widgetRow = 0
-            self._widgetCol += 1
-        else:
-            self._widgetRow += 1
-            if self._widgetRow == self._rowNum:
-                self._widgetRow = 0
-                self._widgetCol += 1
+        self._items.append([widget, full])
+        self._mainLayout.addWidget(widget, full)
 
     def _handleShortcut(self, button):
         """
@@ -450,6 +549,46 @@ class QModernSection(QtWidgets.QWidget):
         """
         button.click()
 
+    def _reflow(self):
+        """
+        Place all widgets again, without recreating them
+        """
+        self._mainLayout.setRowCount(self._rowNum)
+        self._mainLayout.arrange(self._items)
+
+    def _setButtonSize(self, btn, full):
+        """
+        Set icon size and size policy of a button
+        """
+        s = 32 if full else 16
+        btn.setIconSize(QtCore.QSize(s, s))
+        sp = btn.sizePolicy()
+        sp.setVerticalPolicy(sp.Expanding if full else sp.Fixed)
+        btn.setSizePolicy(sp)
+
+    def widgets(self):
+        """
+        Return the widgets in layout order
+        """
+        return [widget for widget, full in self._items]
+
+    def takeWidget(self, widget):
+        """
+        Remove a widget without placing the others again,
+        call setWidgetOrder afterwards to close the gap
+        """
+        self._items = [item for item in self._items if item[0] is not widget]
+        if widget in self._buttons: self._buttons.remove(widget)
+        self._mainLayout.removeWidget(widget)
+
+    def setWidgetOrder(self, widgets):
+        """
+        Arrange the widgets in the given order and place them again
+        """
+        items = {id(item[0]): item for item in self._items}
+        self._items = [items[id(widget)] for widget in widgets]
+        self._reflow()
+
     def addCustomWidget(self, widget, full=True):
         """
         Add a custom widget to the end
@@ -462,14 +601,10 @@ class QModernSection(QtWidgets.QWidget):
         """
         btn = QtWidgets.QToolButton()
         btn.setAutoRaise(True)
+        self._buttons.append(btn)
 
         # full
-        s = 32 if full else 16
-        btn.setIconSize(QtCore.QSize(s, s))
-        if full:
-            sp = btn.sizePolicy()
-            sp.setVerticalPolicy(sp.Expanding)
-            btn.setSizePolicy(sp)
+        self._setButtonSize(btn, full)
 
         # icon
         if icon != None:
@@ -574,15 +709,887 @@ class QModernSection(QtWidgets.QWidget):
         """
         return self.addToggleButton(True, icon, title, handler, shortcut, statusTip)
 
+    def rowCount(self):
+        """
+        Return the number of layout rows
+        """
+        return self._rowNum
+
+    def setRowCount(self, numRow):
+        """
+        Set the number of layout rows and place the widgets again
+        """
+        if numRow == self._rowNum: return
+        self._rowNum = numRow
+        self._reflow()
+
+    def setButtonSize(self, full):
+        """
+        Make all buttons added with addButton full-size or small
+        and place the widgets again
+        """
+        changed = False
+        for item in self._items:
+            if item[0] not in self._buttons or item[1] == full: continue
+            self._setButtonSize(item[0], full)
+            item[1] = full
+            changed = True
+        if changed: self._reflow()
+
     def setTitle(self, title):
         """
         Set the text of the title label
         """
-        self.groupBox.setText(title)
+        self.groupBox.setTitle(title)
 
     def title(self):
         """
         Return the text of the title label
         """
-        return str(self.groupBox.text())
+        return str(self.groupBox.title())
+
+
+
+
+
+
+
+
+
+def ribbonColumns(fulls, sizes, numRow):
+    """
+    Return places, column widths, row height and full height of
+    items with the given size hints
+    """
+    places = ribbonPlaces(fulls, numRow)
+    rowHeight = max([s.height() for s, full in zip(sizes, fulls) if not full] or [0])
+    height = rowHeight * numRow
+    widths = []
+    for (col, row), s in zip(places, sizes):
+        while col >= len(widths): widths.append(0)
+        widths[col] = max(widths[col], s.width())
+        if row == None: height = max(height, s.height())
+    return places, widths, rowHeight, height
+
+
+def ribbonPlaces(fulls, numRow):
+    """
+    Return the (column, row) of every item of a section, row is None
+    for full-size items, which span all rows of their column
+    """
+    places = []
+    row = 0
+    col = 0
+    for full in fulls:
+        if full:
+            if row != 0: col += 1
+            places.append((col, None))
+            row = 0
+            col += 1
+        else:
+            places.append((col, row))
+            row += 1
+            if row == numRow:
+                row = 0
+                col += 1
+    return places
+
+
+
+
+
+
+
+
+
+
+class QRibbonLayout(QtWidgets.QLayout):
+    """
+    A layout that gives full-size widgets a column of their own and
+    stacks small widgets in rows, placing all of them in one pass
+    Size hints are measured once and kept until the layout is invalidated
+    """
+
+    def __init__(self, numRow=3):
+        """
+        Initialize the QRibbonLayout
+        """
+        QtWidgets.QLayout.__init__(self)
+        self._items = []
+        self._rowNum = numRow
+        self._full = False
+        self._columns = None
+        self._rect = None
+
+        # ~QLayout leaves deleting the items to the subclass
+        items = self._items
+        self.destroyed.connect(lambda: [shiboken2.delete(item) for item, full in items])
+
+    def addWidget(self, widget, full=False):
+        """
+        Add a widget to the end
+        """
+        # QLayout.addWidget calls addItem, which reads the flag
+        self._full = full
+        QtWidgets.QLayout.addWidget(self, widget)
+        self._full = False
+
+    def addItem(self, item):
+        """
+        Add a layout item to the end
+        """
+        self._items.append([item, self._full])
+        self.invalidate()
+
+    def count(self):
+        """
+        Return the number of items
+        """
+        return len(self._items)
+
+    def itemAt(self, index):
+        """
+        Return the item at index or None
+        """
+        if 0 <= index < len(self._items): return self._items[index][0]
+        return None
+
+    def takeAt(self, index):
+        """
+        Remove and return the item at index
+        """
+        if not 0 <= index < len(self._items): return None
+        item = self._items.pop(index)[0]
+        self.invalidate()
+        return item
+
+    def removeWidget(self, widget):
+        """
+        Remove a widget and delete its layout item
+        """
+        for i, item in enumerate(self._items):
+            if item[0].widget() is widget:
+                shiboken2.delete(self.takeAt(i))
+                return
+
+    def arrange(self, widgets):
+        """
+        Set order and full flags of the widgets from [widget, full] pairs,
+        layout items of widgets left out are deleted
+        """
+        items = {id(item.widget()): item for item, full in self._items}
+        self._items[:] = [[items.pop(id(widget)), full] for widget, full in widgets]
+        for item in items.values(): shiboken2.delete(item)
+        self.invalidate()
+
+    def rowCount(self):
+        """
+        Return the number of rows
+        """
+        return self._rowNum
+
+    def setRowCount(self, numRow):
+        """
+        Set the number of rows
+        """
+        if numRow == self._rowNum: return
+        self._rowNum = numRow
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Forget measured sizes and placed geometry
+        """
+        self._columns = None
+        self._rect = None
+        QtWidgets.QLayout.invalidate(self)
+
+    def expandingDirections(self):
+        """
+        Full-size widgets grow vertically
+        """
+        return Qt.Vertical
+
+    def _measure(self):
+        """
+        Return places, column widths, row height and full height
+        """
+        if self._columns == None:
+            fulls = [full for item, full in self._items]
+            sizes = [item.sizeHint() for item, full in self._items]
+            self._columns = ribbonColumns(fulls, sizes, self._rowNum)
+        return self._columns
+
+    def sizeHint(self):
+        """
+        Return the size needed to show all widgets
+        """
+        places, widths, rowHeight, height = self._measure()
+        spacing = max(self.spacing(), 0)
+        m = self.contentsMargins()
+        width = sum(widths) + spacing * max(len(widths) - 1, 0)
+        return QtCore.QSize(width + m.left() + m.right(), height + m.top() + m.bottom())
+
+    def minimumSize(self):
+        """
+        Return the minimum size
+        """
+        return self.sizeHint()
+
+    def setGeometry(self, rect):
+        """
+        Place all widgets inside rect
+        """
+        QtWidgets.QLayout.setGeometry(self, rect)
+        if rect == self._rect: return
+        self._rect = QtCore.QRect(rect)
+
+        places, widths, rowHeight, height = self._measure()
+        spacing = max(self.spacing(), 0)
+        contents = self.contentsRect()
+        lefts = []
+        x = contents.left()
+        for w in widths:
+            lefts.append(x)
+            x += w + spacing
+        for (item, full), (col, row) in zip(self._items, places):
+            if row == None:
+                geometry = QtCore.QRect(lefts[col], contents.top(), widths[col], contents.height())
+            else:
+                geometry = QtCore.QRect(lefts[col], contents.top() + row*rowHeight, widths[col], rowHeight)
+            item.setGeometry(geometry)
+
+
+
+
+
+
+
+
+
+
+class QModernPaintedButton(QtCore.QObject):
+    """
+    A button of a QModernPaintedSection, it has no widget of its own
+    and is drawn by the section
+    """
+
+    pressed = QtCore.Signal()
+    clicked = QtCore.Signal(bool)
+
+    def __init__(self, section):
+        """
+        Initialize the QModernPaintedButton
+        """
+        QtCore.QObject.__init__(self, section)
+        self._section = section
+        self._action = None
+        self._menu = None
+        self._popupMode = QtWidgets.QToolButton.DelayedPopup
+        self._style = Qt.ToolButtonTextBesideIcon
+        self._iconSize = QtCore.QSize(16, 16)
+        self._size = None
+        self._key = None
+
+    def _changed(self):
+        """
+        Let the section measure and draw the button again
+        """
+        self._size = None
+        self._section._itemChanged(self)
+
+    def _actionChanged(self):
+        """
+        Handle the default action changing
+        """
+        self._section._actionChanged(self)
+
+    def defaultAction(self):
+        """
+        Return the default action
+        """
+        return self._action
+
+    def setDefaultAction(self, action):
+        """
+        Set the action shown and triggered by the button
+        """
+        if action is self._action: return
+        if self._action != None:
+            try: self._action.changed.disconnect(self._actionChanged)
+            except Exception: pass
+        self._action = action
+        action.changed.connect(self._actionChanged)
+        self._changed()
+
+    def menu(self):
+        """
+        Return the drop down menu
+        """
+        return self._menu
+
+    def setMenu(self, menu):
+        """
+        Set the drop down menu
+        """
+        self._menu = menu
+        self._changed()
+
+    def popupMode(self):
+        """
+        Return the popup mode
+        """
+        return self._popupMode
+
+    def setPopupMode(self, mode):
+        """
+        Set the popup mode
+        """
+        self._popupMode = mode
+        self._changed()
+
+    def toolButtonStyle(self):
+        """
+        Return the tool button style
+        """
+        return self._style
+
+    def setToolButtonStyle(self, style):
+        """
+        Set the tool button style
+        """
+        if style == self._style: return
+        self._style = style
+        self._changed()
+
+    def iconSize(self):
+        """
+        Return the icon size
+        """
+        return self._iconSize
+
+    def setIconSize(self, size):
+        """
+        Set the icon size
+        """
+        if size == self._iconSize: return
+        self._iconSize = size
+        self._changed()
+
+    def text(self):
+        """
+        Return the text of the default action
+        """
+        return self._action.text() if self._action != None else ''
+
+    def isVisible(self):
+        """
+        Return whether the button is shown, a button follows the
+        visibility of its default action like a QToolButton
+        """
+        return self._action == None or self._action.isVisible()
+
+    def click(self):
+        """
+        Trigger the default action as if the button was clicked
+        """
+        self.pressed.emit()
+        self._release()
+
+    def _release(self):
+        """
+        Trigger the default action after the button was released
+        """
+        action = self._action
+        if action == None or not action.isEnabled(): return
+        action.trigger()
+        self.clicked.emit(action.isChecked())
+
+
+
+
+
+
+
+
+
+
+class QModernPaintedSection(QtWidgets.QWidget):
+    """
+    A QModernSection replacement that draws its title and all of its
+    buttons itself instead of using a widget for each of them
+    """
+
+    _shortcutAdded = QtCore.Signal()
+    _rowNum = 3
+
+    def __init__(self, title, numRow):
+        """
+        Initialize the QModernPaintedSection
+        """
+        QtWidgets.QWidget.__init__(self)
+        self.setMouseTracking(True)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Expanding)
+
+        self._title = title
+        self._rowNum = numRow
+        self._items = []
+        self._buttons = []
+        self._shortcuts = []
+        self._rects = []
+        self._hint = None
+        self._dirty = True
+        self._hover = None
+        self._pressed = None
+        self._popupTimer = QtCore.QTimer(self)
+        self._popupTimer.setSingleShot(True)
+        self._popupTimer.timeout.connect(self._popupDelayed)
+
+    # Geometry
+
+    def _frameOption(self, rect):
+        """
+        Return the style option of the section frame and title
+        """
+        opt = QtWidgets.QStyleOptionGroupBox()
+        opt.initFrom(self)
+        opt.rect = rect
+        opt.text = self._title
+        opt.lineWidth = 1
+        opt.midLineWidth = 0
+        opt.textAlignment = Qt.AlignLeft
+        opt.textColor = self.palette().color(QtGui.QPalette.WindowText)
+        opt.subControls = QtWidgets.QStyle.SC_GroupBoxFrame
+        if self._title: opt.subControls |= QtWidgets.QStyle.SC_GroupBoxLabel
+        return opt
+
+    def _contentsRect(self, rect):
+        """
+        Return the area inside the frame for the given section rect
+        """
+        return self.style().subControlRect(QtWidgets.QStyle.CC_GroupBox,
+            self._frameOption(rect), QtWidgets.QStyle.SC_GroupBoxContents, self)
+
+    def _buttonOption(self, btn, rect):
+        """
+        Return the style option of a button
+        """
+        style = QtWidgets.QStyle
+        action = btn.defaultAction()
+        enabled = self.isEnabled() and (action == None or action.isEnabled())
+        hover = btn is self._hover and enabled
+        down = btn is self._pressed
+
+        opt = QtWidgets.QStyleOptionToolButton()
+        opt.initFrom(self)
+        opt.rect = rect
+        opt.text = action.text() if action != None else ''
+        opt.icon = action.icon() if action != None else QtGui.QIcon()
+        opt.iconSize = btn.iconSize()
+        opt.toolButtonStyle = btn.toolButtonStyle()
+        opt.arrowType = Qt.NoArrow
+        opt.subControls = style.SC_ToolButton
+        opt.activeSubControls = style.SC_None
+        opt.features = QtWidgets.QStyleOptionToolButton.None_
+
+        state = style.State_AutoRaise
+        if enabled: state |= style.State_Enabled
+        if self.isActiveWindow(): state |= style.State_Active
+        if hover: state |= style.State_MouseOver | style.State_Raised
+        if action != None and action.isChecked(): state |= style.State_On
+        if down:
+            state |= style.State_Sunken
+            opt.activeSubControls = style.SC_ToolButton
+
+        if btn.menu() != None:
+            opt.features = QtWidgets.QStyleOptionToolButton.HasMenu
+            if btn.popupMode() == QtWidgets.QToolButton.MenuButtonPopup:
+                opt.features |= QtWidgets.QStyleOptionToolButton.MenuButtonPopup
+                opt.subControls |= style.SC_ToolButtonMenu
+        opt.state = state
+        return opt
+
+    def _buttonSize(self, btn):
+        """
+        Return the size hint of a button, like QToolButton.sizeHint
+        """
+        if btn._size != None: return btn._size
+        opt = self._buttonOption(btn, QtCore.QRect())
+        fm = self.fontMetrics()
+        w = h = 0
+        if opt.toolButtonStyle != Qt.ToolButtonTextOnly:
+            w = opt.iconSize.width()
+            h = opt.iconSize.height()
+        if opt.toolButtonStyle != Qt.ToolButtonIconOnly:
+            text = fm.size(Qt.TextShowMnemonic, opt.text)
+            if opt.toolButtonStyle == Qt.ToolButtonTextOnly:
+                w = text.width()
+                h = text.height()
+            elif opt.toolButtonStyle == Qt.ToolButtonTextUnderIcon:
+                h += 4 + text.height()
+                w = max(w, text.width())
+            else:
+                w += 4 + text.width()
+                h = max(h, text.height())
+            w += 4
+        if opt.features & QtWidgets.QStyleOptionToolButton.MenuButtonPopup:
+            w += self.style().pixelMetric(QtWidgets.QStyle.PM_MenuButtonIndicator, opt, self)
+        btn._size = self.style().sizeFromContents(QtWidgets.QStyle.CT_ToolButton,
+            opt, QtCore.QSize(w, h), self)
+        return btn._size
+
+    def _columns(self):
+        """
+        Return places, column widths, row height and contents height
+        of the visible buttons
+        """
+        items = [(btn, full) for btn, full in self._items if btn.isVisible()]
+        fulls = [full for btn, full in items]
+        sizes = [self._buttonSize(btn) for btn, full in items]
+        return ribbonColumns(fulls, sizes, self._rowNum)
+
+    def _doLayout(self):
+        """
+        Place all buttons inside the current section rect, hidden
+        buttons get an empty rect
+        """
+        if not self._dirty: return
+        self._dirty = False
+        places, widths, rowHeight, height = self._columns()
+        contents = self._contentsRect(self.rect())
+        lefts = []
+        x = contents.left()
+        for w in widths:
+            lefts.append(x)
+            x += w
+        self._rects = []
+        places = iter(places)
+        for btn, full in self._items:
+            if not btn.isVisible():
+                self._rects.append(QtCore.QRect())
+                continue
+            col, row = next(places)
+            if row == None:
+                rect = QtCore.QRect(lefts[col], contents.top(), widths[col], contents.height())
+            else:
+                rect = QtCore.QRect(lefts[col], contents.top() + row*rowHeight, widths[col], rowHeight)
+            self._rects.append(rect)
+
+    def _invalidate(self):
+        """
+        Measure and place the buttons again
+        """
+        self._dirty = True
+        self._hint = None
+        self.updateGeometry()
+        self.update()
+
+    def _itemChanged(self, btn):
+        """
+        Handle the look of a button changing
+        """
+        self._invalidate()
+
+    def _actionChanged(self, btn):
+        """
+        Handle the default action of a button changing, only a
+        change of text, icon or visibility can change the layout
+        """
+        action = btn.defaultAction()
+        key = (action.text(), action.icon().cacheKey(), action.isVisible())
+        if btn._key != key:
+            btn._key = key
+            btn._changed()
+            return
+        index = self._indexOf(btn)
+        if index != None and not self._dirty: self.update(self._rects[index])
+
+    def _indexOf(self, btn):
+        """
+        Return the index of a button or None
+        """
+        for i, item in enumerate(self._items):
+            if item[0] is btn: return i
+        return None
+
+    def buttonAt(self, pos):
+        """
+        Return the button at the given position or None
+        """
+        self._doLayout()
+        for rect, item in zip(self._rects, self._items):
+            if not rect.isNull() and rect.contains(pos): return item[0]
+        return None
+
+    def sizeHint(self):
+        """
+        Return the size needed to show all buttons
+        """
+        if self._hint == None:
+            places, widths, rowHeight, height = self._columns()
+            frame = QtCore.QRect(0, 0, 1000, 1000)
+            contents = self._contentsRect(frame)
+            self._hint = QtCore.QSize(sum(widths) + frame.width() - contents.width(),
+                                      height + frame.height() - contents.height())
+        return self._hint
+
+    def minimumSizeHint(self):
+        """
+        Return the minimum size
+        """
+        return self.sizeHint()
+
+    # Events
+
+    def event(self, event):
+        """
+        Show the tooltip of the button under the cursor
+        """
+        if event.type() == QtCore.QEvent.ToolTip:
+            btn = self.buttonAt(event.pos())
+            action = btn.defaultAction() if btn != None else None
+            if action != None and action.toolTip():
+                QtWidgets.QToolTip.showText(event.globalPos(), action.toolTip(), self,
+                                            self._rects[self._indexOf(btn)])
+            else:
+                QtWidgets.QToolTip.hideText()
+                event.ignore()
+            return True
+        return QtWidgets.QWidget.event(self, event)
+
+    def resizeEvent(self, event):
+        """
+        Place the buttons for the new size
+        """
+        self._dirty = True
+        QtWidgets.QWidget.resizeEvent(self, event)
+
+    def changeEvent(self, event):
+        """
+        Measure the buttons again when the font or style changes
+        """
+        if event.type() in (QtCore.QEvent.FontChange, QtCore.QEvent.StyleChange):
+            for btn, full in self._items: btn._size = None
+            self._invalidate()
+        QtWidgets.QWidget.changeEvent(self, event)
+
+    def _setHover(self, btn):
+        """
+        Change the button under the cursor
+        """
+        if btn is self._hover: return
+        old = self._hover
+        self._hover = btn
+        for b in (old, btn):
+            index = self._indexOf(b) if b != None else None
+            if index != None: self.update(self._rects[index])
+        action = btn.defaultAction() if btn != None else None
+        tip = action.statusTip() if action != None else ''
+        QtWidgets.QApplication.sendEvent(self, QtGui.QStatusTipEvent(tip))
+
+    def mouseMoveEvent(self, event):
+        """
+        Track the button under the cursor
+        """
+        self._setHover(self.buttonAt(event.pos()))
+
+    def leaveEvent(self, event):
+        """
+        Clear the button under the cursor
+        """
+        self._setHover(None)
+
+    def mousePressEvent(self, event):
+        """
+        Press a button or open its menu
+        """
+        btn = self.buttonAt(event.pos())
+        if event.button() != Qt.LeftButton or btn == None:
+            QtWidgets.QWidget.mousePressEvent(self, event)
+            return
+        action = btn.defaultAction()
+        if action != None and not action.isEnabled(): return
+
+        rect = self._rects[self._indexOf(btn)]
+        opt = self._buttonOption(btn, rect)
+        if btn.menu() != None:
+            menuRect = self.style().subControlRect(QtWidgets.QStyle.CC_ToolButton, opt,
+                QtWidgets.QStyle.SC_ToolButtonMenu, self)
+            if btn.popupMode() == QtWidgets.QToolButton.InstantPopup or menuRect.contains(event.pos()):
+                btn.menu().exec_(self.mapToGlobal(rect.bottomLeft()))
+                return
+
+        self._pressed = btn
+        self.update(rect)
+        btn.pressed.emit()
+        if btn.menu() != None and btn.popupMode() == QtWidgets.QToolButton.DelayedPopup:
+            self._popupTimer.start(self.style().styleHint(
+                QtWidgets.QStyle.SH_ToolButton_PopupDelay, opt, self))
+
+    def _popupDelayed(self):
+        """
+        Open the menu of a button held down long enough
+        """
+        btn = self._pressed
+        if btn == None or btn.menu() == None: return
+        index = self._indexOf(btn)
+        self._pressed = None
+        if index == None: return
+        rect = self._rects[index]
+        self.update(rect)
+        btn.menu().exec_(self.mapToGlobal(rect.bottomLeft()))
+
+    def mouseReleaseEvent(self, event):
+        """
+        Click the pressed button if the cursor is still on it
+        """
+        self._popupTimer.stop()
+        btn = self._pressed
+        self._pressed = None
+        if btn == None: return
+        index = self._indexOf(btn)
+        if index == None: return
+        self.update(self._rects[index])
+        if event.button() == Qt.LeftButton and self.buttonAt(event.pos()) is btn:
+            btn._release()
+
+    def paintEvent(self, event):
+        """
+        Draw the frame, the title and the buttons
+        """
+        self._doLayout()
+        painter = QtGui.QPainter(self)
+        style = self.style()
+        style.drawComplexControl(QtWidgets.QStyle.CC_GroupBox,
+            self._frameOption(self.rect()), painter, self)
+        for rect, (btn, full) in zip(self._rects, self._items):
+            if rect.isNull() or not rect.intersects(event.rect()): continue
+            style.drawComplexControl(QtWidgets.QStyle.CC_ToolButton,
+                self._buttonOption(btn, rect), painter, self)
+
+    # QModernSection interface
+
+    def _handleShortcut(self, button):
+        """
+        Handles the user clicking a shortcut
+        """
+        button.click()
+
+    def _setButtonSize(self, btn, full):
+        """
+        Set icon size of a button
+        """
+        s = 32 if full else 16
+        btn.setIconSize(QtCore.QSize(s, s))
+
+    def widgets(self):
+        """
+        Return the buttons in layout order
+        """
+        return [btn for btn, full in self._items]
+
+    def takeWidget(self, btn):
+        """
+        Remove a button
+        """
+        self._items = [item for item in self._items if item[0] is not btn]
+        if btn in self._buttons: self._buttons.remove(btn)
+        if self._hover is btn: self._hover = None
+        if self._pressed is btn: self._pressed = None
+        self._invalidate()
+
+    def setWidgetOrder(self, buttons):
+        """
+        Arrange the buttons in the given order
+        """
+        items = {id(item[0]): item for item in self._items}
+        self._items = [items[id(btn)] for btn in buttons]
+        self._invalidate()
+
+    def addButton(self, full=False, icon=None, title=None, handler=None, shortcut=None, statusTip=None, menu=None):
+        """
+        Add a button to the end
+        """
+        btn = QModernPaintedButton(self)
+        self._buttons.append(btn)
+        self._setButtonSize(btn, full)
+
+        # icon, title and statusTip
+        if icon != None or title != None or statusTip != None:
+            action = QtWidgets.QAction(btn)
+            if icon != None: action.setIcon(QtGui.QIcon(icon))
+            if title != None: action.setText(title)
+            if statusTip != None: action.setStatusTip(statusTip)
+            btn.setDefaultAction(action)
+        if full: btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
+        else: btn.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+
+        # handler
+        if handler != None:
+            btn.clicked.connect(handler)
+
+        # shortcut
+        if shortcut != None:
+            sh = QtWidgets.QShortcut(shortcut, self)
+            sh.activated.connect(lambda arg=btn: self._handleShortcut(arg))
+            self._shortcuts.append(sh)
+            self._shortcutAdded.emit()
+
+        # menu
+        if menu != None:
+            btn.setMenu(menu)
+            btn.setPopupMode(QtWidgets.QToolButton.MenuButtonPopup)
+
+        self._items.append([btn, full])
+        self._invalidate()
+        return btn
+
+    def addSmallButton(self, icon=None, title='', handler=None, shortcut=None, statusTip=None):
+        """
+        Add a small button to the end
+        """
+        return self.addButton(False, icon, title, handler, shortcut, statusTip)
+
+    def addFullButton(self, icon=None, title='', handler=None, shortcut=None, statusTip=None):
+        """
+        Add a full-size button to the end
+        """
+        return self.addButton(True, icon, title, handler, shortcut, statusTip)
+
+    def rowCount(self):
+        """
+        Return the number of layout rows
+        """
+        return self._rowNum
+
+    def setRowCount(self, numRow):
+        """
+        Set the number of layout rows
+        """
+        if numRow == self._rowNum: return
+        self._rowNum = numRow
+        self._invalidate()
+
+    def setButtonSize(self, full):
+        """
+        Make all buttons full-size or small
+        """
+        for item in self._items:
+            if item[1] == full: continue
+            self._setButtonSize(item[0], full)
+            item[1] = full
+        self._invalidate()
+
+    def setTitle(self, title):
+        """
+        Set the title
+        """
+        self._title = title
+        self._invalidate()
+
+    def title(self):
+        """
+        Return the title
+        """
+        return self._title
 
@@ -38,15 +38,16 @@ class QRecentFilesManager(QtCore.QObject):
     An object that keeps track of paths to recently-opened files
     """
     
-    _masterList = []
     _maxLength = 10
     pathAdded = QtCore.Signal(str)
+    pathsChanged = QtCore.Signal()
     
     def __init__(self, data=None):
         """
         Initialize the QRecentFilesManager
         """
         QtCore.QObject.__init__(self)
+        self._masterList = []
         if data != None: self._initFromData(data)
 
     def _initFromData(self, data):
@@ -120,6 +121,22 @@ class QRecentFilesManager(QtCore.QObject):
             toReturn.append(path)
         return toReturn
 
+    def setPaths(self, paths):
+        """
+        Replace the full list of paths.
+        Automatically remove duplicates.
+        """
+        new = []
+        for path in paths:
+            if path in (None, 'None', 'none', True, 'True', 'true', False, 'False', 'false', 0, 1, ''): continue
+            path = path.replace('\\', '/')
+            if path in new: continue
+            new.append(path)
+        self._masterList = new[:self._maxLength]
+
+        # Emit the pathsChanged signal
+        self.pathsChanged.emit()
+
     def populateFromData(self, data):
         """
         Populate the filepath list from the data given
@@ -0,0 +1,135 @@
+"""
+Regression tests for widget ownership in the ribbon library: every menu,
+tab, section and file menu owns its own children, and switching tabs does
+not leave objects behind.
+
+Run with QT_QPA_PLATFORM=offscreen when no display is available.
+"""
+
+import os
+import sys
+import types
+import tracemalloc
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The ribbon library runs inside FreeCAD, stand-ins are enough for these tests
+sys.modules.setdefault("FreeCAD", types.ModuleType("FreeCAD"))
+sys.modules.setdefault("FreeCADGui", types.ModuleType("FreeCADGui"))
+
+try:
+    from PySide2 import QtCore, QtGui, QtWidgets
+except ImportError:
+    raise unittest.SkipTest("PySide2 is not installed")
+from menu.ModernMenu import QModernMenu
+from menu.FileMenu import QFileMenu, QFileMenuPanel
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def flushDeletes():
+    """
+    Delete objects scheduled with deleteLater.
+    """
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def liveWidgets():
+    """
+    Return number of live widgets.
+    """
+    return len(QtWidgets.QApplication.allWidgets())
+
+
+def createFileMenu():
+    """
+    Return a file menu like the one built for every workbench.
+    """
+    fileMenu = QFileMenu()
+    fileMenu.addButton(title="New")
+    fileMenu.addArrowButton(lambda: QFileMenuPanel("Open"), title="Open")
+    fileMenu.addArrowButton(QFileMenuPanel("Export"), title="Export")
+    fileMenu.RecentFilesManager().setPaths(["a.FCStd", "b.FCStd"])
+    return fileMenu
+
+
+def createMenu(tabs=4):
+    """
+    Return a ribbon with a few tabs holding sections and buttons.
+    """
+    menu = QModernMenu(QtGui.QIcon(), "Modern UI")
+    for i in range(tabs):
+        tab = menu.addTab(QtGui.QIcon(), "Tab %d" % i)
+        for j in range(3):
+            section = tab.addSection("Section %d" % j, 3)
+            for k in range(4):
+                section.addButton(full=k == 0, title="Button %d" % k, shortcut="Ctrl+%d" % k)
+    return menu
+
+
+class OwnershipTest(unittest.TestCase):
+
+    def tearDown(self):
+        flushDeletes()
+
+    def testMenusHaveOwnLists(self):
+        first = createMenu(2)
+        second = QModernMenu(QtGui.QIcon(), "Modern UI")
+        self.assertEqual(len(first._tabs), 3)
+        self.assertEqual(second._tabs, [None])
+
+        tab = second.addTab(QtGui.QIcon(), "Other")
+        self.assertEqual(tab._sections, [])
+        section = tab.addSection("Other", 3)
+        self.assertEqual(section._shortcuts, [])
+        self.assertEqual(len(first._tabs[1]._sections), 3)
+        self.assertIsNot(first._tabs[1]._sections, tab._sections)
+
+    def testFileMenusHaveOwnLists(self):
+        first = createFileMenu()
+        second = QFileMenu()
+        self.assertEqual(len(first._arrowBtns), 2)
+        self.assertEqual(second._arrowBtns, [])
+        self.assertEqual(second._panels, [])
+        self.assertEqual(second._shortcuts, [])
+        self.assertIsNot(first._arrowBtns, second._arrowBtns)
+        self.assertIsNot(first.RecentFilesManager(), second.RecentFilesManager())
+        self.assertEqual(second.RecentFilesManager().paths(), [])
+
+    def testTabSwitchesStayFlat(self):
+        menu = createMenu()
+        count = len(menu._tabs) - 1
+        # File menus are cached per workbench and set again on every switch
+        fileMenus = [createFileMenu(), createFileMenu()]
+        signal = QtCore.SIGNAL("_shortcutAdded()")
+
+        def switch(times):
+            for i in range(times):
+                menu._tabBar.setCurrentIndex(i % count + 1)
+                menu.setFileMenu(fileMenus[i % 2])
+                if i % 50 == 0: flushDeletes()
+            flushDeletes()
+
+        # Warm up caches before measuring
+        switch(100)
+        widgets = liveWidgets()
+        children = len(menu.findChildren(QtCore.QObject))
+        receivers = [fileMenu.receivers(signal) for fileMenu in fileMenus]
+        tracemalloc.start()
+        heap = tracemalloc.get_traced_memory()[0]
+
+        switch(1000)
+        grown = tracemalloc.get_traced_memory()[0] - heap
+        tracemalloc.stop()
+
+        self.assertEqual(liveWidgets(), widgets)
+        self.assertEqual(len(menu.findChildren(QtCore.QObject)), children)
+        self.assertEqual([fileMenu.receivers(signal) for fileMenu in fileMenus], receivers)
+        self.assertEqual(menu.fileMenu().receivers(signal), 1)
+        self.assertLess(grown, 256 * 1024)
+
+if __name__ == "__main__":
+    unittest.main()